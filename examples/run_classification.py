@@ -4,6 +4,7 @@
 import argparse
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import cv2
@@ -11,7 +12,7 @@ import numpy as np
 import openvino.runtime as ov
 
 import openvino_xai as xai
-from openvino_xai.common.utils import logger
+from openvino_xai.common.utils import get_core, logger
 from openvino_xai.explainer.explainer import ExplainMode
 
 
@@ -24,28 +25,28 @@ def get_argument_parser():
 
 
 def preprocess_fn(x: np.ndarray) -> np.ndarray:
-    x = x[:, :, ::-1]
-    x = cv2.resize(src=x, dsize=(224, 224))
-    x = x.transpose((2, 0, 1))
-    x = np.expand_dims(x, 0)
-    return x
+    # INTER_AREA is faster and avoids aliasing when downscaling
+    interpolation = cv2.INTER_AREA if x.shape[0] > 224 or x.shape[1] > 224 else cv2.INTER_LINEAR
+    x = cv2.resize(src=x, dsize=(224, 224), interpolation=interpolation)
+    # Write channels into contiguous NCHW input tensor, BGR -> RGB swap is done by the channel order
+    out = np.empty((1, 3, 224, 224), dtype=np.float32)
+    out[0, 0] = x[:, :, 2]
+    out[0, 1] = x[:, :, 1]
+    out[0, 2] = x[:, :, 0]
+    return out
 
 
 def postprocess_fn(x) -> np.ndarray:
     return x["logits"]
 
 
-def explain_auto(args):
+def explain_auto(args, model: ov.Model):
     """
     Default use case using ExplainMode.AUTO.
     AUTO means that Explainer under the hood will attempt to use white-box methods and insert XAI branch in the model.
     If insertion fails, then black-box method will be applied.
     """
 
-    # Create ov.Model
-    model: ov.Model
-    model = ov.Core().read_model(args.model_path)
-
     # Create explainer object
     explainer = xai.Explainer(
         model=model,
@@ -63,8 +64,11 @@ def explain_auto(args):
     )
 
     logger.info(
-        f"explain_auto: Generated {len(explanation.saliency_map)} classification "
-        f"saliency maps of layout {explanation.layout} with shape {explanation.shape}."
+        "explain_auto: Generated %d classification "
+        "saliency maps of layout %s with shape %s.",
+        len(explanation.saliency_map),
+        explanation.layout,
+        explanation.shape,
     )
 
     # Save saliency maps for visual inspection
@@ -73,16 +77,12 @@ def explain_auto(args):
         explanation.save(output, Path(args.image_path).stem)
 
 
-def explain_white_box(args):
+def explain_white_box(args, model: ov.Model):
     """
     Advanced use case using ExplainMode.WHITEBOX.
     Insertion parameters (e.g. target_layer) are provided to further configure the white-box method (optional).
     """
 
-    # Create ov.Model
-    model: ov.Model
-    model = ov.Core().read_model(args.model_path)
-
     # Create explainer object
     explainer = xai.Explainer(
         model=model,
@@ -110,8 +110,11 @@ def explain_white_box(args):
         )
 
     logger.info(
-        f"explain_white_box: Generated {len(explanation.saliency_map)} classification "
-        f"saliency maps of layout {explanation.layout} with shape {explanation.shape}."
+        "explain_white_box: Generated %d classification "
+        "saliency maps of layout %s with shape %s.",
+        len(explanation.saliency_map),
+        explanation.layout,
+        explanation.shape,
     )
 
     # Save saliency maps for visual inspection
@@ -120,16 +123,12 @@ def explain_white_box(args):
         explanation.save(output, Path(args.image_path).stem)
 
 
-def explain_black_box(args):
+def explain_black_box(args, model: ov.Model):
     """
     Advanced use case using ExplainMode.BLACKBOX.
     postprocess_fn is required for black-box methods.
     """
 
-    # Create ov.Model
-    model: ov.Model
-    model = ov.Core().read_model(args.model_path)
-
     # Create explainer object
     explainer = xai.Explainer(
         model=model,
@@ -153,8 +152,11 @@ def explain_black_box(args):
     )
 
     logger.info(
-        f"explain_black_box: Generated {len(explanation.saliency_map)} classification "
-        f"saliency maps of layout {explanation.layout} with shape {explanation.shape}."
+        "explain_black_box: Generated %d classification "
+        "saliency maps of layout %s with shape %s.",
+        len(explanation.saliency_map),
+        explanation.layout,
+        explanation.shape,
     )
 
     # Save saliency maps for visual inspection
@@ -163,15 +165,11 @@ def explain_black_box(args):
         explanation.save(output, Path(args.image_path).stem)
 
 
-def explain_white_box_multiple_images(args):
+def explain_white_box_multiple_images(args, model: ov.Model):
     """
     Using the same explainer object to explain multiple images.
     """
 
-    # Create ov.Model
-    model: ov.Model
-    model = ov.Core().read_model(args.model_path)
-
     # Create explainer object
     explainer = xai.Explainer(
         model=model,
@@ -180,24 +178,24 @@ def explain_white_box_multiple_images(args):
     )
 
     # Create list of images
-    img_data_formats = (".jpg", ".jpeg", ".gif", ".bmp", ".tif", ".tiff", ".png")
-    if args.image_path.lower().endswith(img_data_formats):
+    img_data_formats = {".jpg", ".jpeg", ".gif", ".bmp", ".tif", ".tiff", ".png"}
+    if Path(args.image_path).suffix.lower() in img_data_formats:
         # args.image_path is a path to the image
         img_files = [args.image_path] * 5
     else:
-        img_files = []
         # args.image_path is a directory (with sub-folder support)
-        for root, _, _ in os.walk(args.image_path):
-            for format_ in img_data_formats:
-                img_files.extend([os.path.join(root, file.name) for file in Path(root).glob(f"*{format_}")])
+        img_files = [str(file) for file in Path(args.image_path).rglob("*") if file.suffix.lower() in img_data_formats]
 
     # Generate explanation
-    images = [cv2.imread(image_path) for image_path in img_files]
-    explanation = [explainer(image, targets=[14]) for image in images]
+    # Images are decoded in background threads (OpenCV releases the GIL), overlapping decoding with inference
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        explanation = [explainer(image, targets=[14]) for image in executor.map(cv2.imread, img_files)]
 
     logger.info(
-        f"explain_white_box_multiple_images: Generated {len(explanation)} explanations "
-        f"of layout {explanation[0].layout} with shape {explanation[0].shape}."
+        "explain_white_box_multiple_images: Generated %d explanations of layout %s with shape %s.",
+        len(explanation),
+        explanation[0].layout,
+        explanation[0].shape,
     )
 
     # Save saliency maps for visual inspection
@@ -206,13 +204,9 @@ def explain_white_box_multiple_images(args):
         explanation[0].save(output, Path(args.image_path).stem)
 
 
-def explain_white_box_vit(args):
+def explain_white_box_vit(args, model: ov.Model):
     """Vision transformer example."""
 
-    # Create ov.Model
-    model: ov.Model
-    model = ov.Core().read_model(args.model_path)
-
     # Create explainer object
     explainer = xai.Explainer(
         model=model,
@@ -234,8 +228,11 @@ def explain_white_box_vit(args):
     )
 
     logger.info(
-        f"explain_white_box_vit: Generated {len(explanation.saliency_map)} classification "
-        f"saliency maps of layout {explanation.layout} with shape {explanation.shape}."
+        "explain_white_box_vit: Generated %d classification "
+        "saliency maps of layout %s with shape %s.",
+        len(explanation.saliency_map),
+        explanation.layout,
+        explanation.shape,
     )
 
     # Save saliency maps for visual inspection
@@ -244,15 +241,12 @@ def explain_white_box_vit(args):
         explanation.save(output, Path(args.image_path).stem)
 
 
-def insert_xai(args):
+def insert_xai(args, model: ov.Model):
     """
     White-box scenario.
     Insertion of the XAI branch into the IR, thus IR has additional 'saliency_map' output.
     """
 
-    # Create ov.Model
-    model = ov.Core().read_model(args.model_path)
-
     # insert XAI branch
     model_xai = xai.insert_xai(
         model,
@@ -266,16 +260,12 @@ def insert_xai(args):
     return model_xai
 
 
-def insert_xai_w_params(args):
+def insert_xai_w_params(args, model: ov.Model):
     """
     White-box scenario.
     Insertion of the XAI branch into the IR with insertion parameters (e.g. target_layer), thus, IR has additional 'saliency_map' output.
     """
 
-    # Create ov.Model
-    model: ov.Model
-    model = ov.Core().read_model(args.model_path)
-
     # insert XAI branch
     model_xai = xai.insert_xai(
         model,
@@ -297,16 +287,31 @@ def main(argv):
     parser = get_argument_parser()
     args = parser.parse_args(argv)
 
-    # Get explanation
-    explain_auto(args)
-    explain_white_box(args)
-    explain_black_box(args)
-    explain_white_box_multiple_images(args)
-    # explain_white_box_vit(args)
-
-    # Insert XAI branch into the model
-    insert_xai(args)
-    insert_xai_w_params(args)
+    # Core is shared within the process, its cache setting is restored when the example returns
+    core = get_core()
+    prev_cache_dir = core.get_property("CACHE_DIR")
+    if args.output is not None:
+        # Cache compiled models on disk, so that subsequent runs skip the model compilation
+        core.set_property({"CACHE_DIR": str(Path(args.output) / ".ov_cache")})
+
+    try:
+        # Create ov.Model once and share it across the use cases below
+        # (XAI insertion does not modify the original model)
+        model: ov.Model
+        model = core.read_model(args.model_path)
+
+        # Get explanation
+        explain_auto(args, model)
+        explain_white_box(args, model)
+        explain_black_box(args, model)
+        explain_white_box_multiple_images(args, model)
+        # explain_white_box_vit(args, model)
+
+        # Insert XAI branch into the model
+        insert_xai(args, model)
+        insert_xai_w_params(args, model)
+    finally:
+        core.set_property({"CACHE_DIR": prev_cache_dir})
 
 
 if __name__ == "__main__":
@@ -10,7 +10,7 @@ import numpy as np
 import openvino.runtime as ov
 
 import openvino_xai as xai
-from openvino_xai.common.utils import logger
+from openvino_xai.common.utils import get_core, logger
 from openvino_xai.explainer.explainer import ExplainMode
 from openvino_xai.methods.black_box.base import Preset
 
@@ -37,17 +37,13 @@ def postprocess_fn(x) -> np.ndarray:
     return x["boxes"][:, :, :4], x["boxes"][:, :, 4], x["labels"]
 
 
-def explain_white_box(args):
+def explain_white_box(args, model: ov.Model):
     """
     White-box scenario.
     Per-class saliency map generation for single-stage detection models (using DetClassProbabilityMap).
     Insertion of the XAI branch into the model, thus model has additional 'saliency_map' output.
     """
 
-    # Create ov.Model
-    model: ov.Model
-    model = ov.Core().read_model(args.model_path)
-
     # # OTX YOLOX
     # cls_head_output_node_names = [
     #     "/bbox_head/multi_level_conv_cls.0/Conv/WithoutBiases",
@@ -83,8 +79,11 @@ def explain_white_box(args):
     )
 
     logger.info(
-        f"Generated {len(explanation.saliency_map)} detection "
-        f"saliency maps of layout {explanation.layout} with shape {explanation.shape}."
+        "Generated %d detection "
+        "saliency maps of layout %s with shape %s.",
+        len(explanation.saliency_map),
+        explanation.layout,
+        explanation.shape,
     )
 
     # Save saliency maps for visual inspection
@@ -93,16 +92,12 @@ def explain_white_box(args):
         explanation.save(output, Path(args.image_path).stem)
 
 
-def explain_black_box(args):
+def explain_black_box(args, model: ov.Model):
     """
     Black-box scenario.
     Per-box saliency map generation for all detection models (using AISEDetection).
     """
 
-    # Create ov.Model
-    model: ov.Model
-    model = ov.Core().read_model(args.model_path)
-
     # Create explainer object
     explainer = xai.Explainer(
         model=model,
@@ -124,8 +119,11 @@ def explain_black_box(args):
     )
 
     logger.info(
-        f"Generated {len(explanation.saliency_map)} detection "
-        f"saliency maps of layout {explanation.layout} with shape {explanation.shape}."
+        "Generated %d detection "
+        "saliency maps of layout %s with shape %s.",
+        len(explanation.saliency_map),
+        explanation.layout,
+        explanation.shape,
     )
 
     # Save saliency maps for visual inspection
@@ -138,8 +136,23 @@ def main(argv):
     parser = get_argument_parser()
     args = parser.parse_args(argv)
 
-    explain_white_box(args)
-    explain_black_box(args)
+    # Core is shared within the process, its cache setting is restored when the example returns
+    core = get_core()
+    prev_cache_dir = core.get_property("CACHE_DIR")
+    if args.output is not None:
+        # Cache compiled models on disk, so that subsequent runs skip the model compilation
+        core.set_property({"CACHE_DIR": str(Path(args.output) / ".ov_cache")})
+
+    try:
+        # Create ov.Model once and share it across the use cases below
+        # (XAI insertion does not modify the original model)
+        model: ov.Model
+        model = core.read_model(args.model_path)
+
+        explain_white_box(args, model)
+        explain_black_box(args, model)
+    finally:
+        core.set_property({"CACHE_DIR": prev_cache_dir})
 
 
 if __name__ == "__main__":
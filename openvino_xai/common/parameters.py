@@ -38,21 +38,29 @@ class Method(Enum):
     AISE = "aise"
 
 
-WhiteBoxXAIMethods = {
-    Method.ACTIVATIONMAP,
-    Method.RECIPROCAM,
-    Method.DETCLASSPROBABILITYMAP,
-}
-BlackBoxXAIMethods = {
-    Method.RISE,
-    Method.AISE,
-}
-ClassificationXAIMethods = {
-    Method.ACTIVATIONMAP,
-    Method.RECIPROCAM,
-    Method.RISE,
-    Method.AISE,
-}
-DetectionXAIMethods = {
-    Method.DETCLASSPROBABILITYMAP,
-}
+WhiteBoxXAIMethods = frozenset(
+    {
+        Method.ACTIVATIONMAP,
+        Method.RECIPROCAM,
+        Method.DETCLASSPROBABILITYMAP,
+    }
+)
+BlackBoxXAIMethods = frozenset(
+    {
+        Method.RISE,
+        Method.AISE,
+    }
+)
+ClassificationXAIMethods = frozenset(
+    {
+        Method.ACTIVATIONMAP,
+        Method.RECIPROCAM,
+        Method.RISE,
+        Method.AISE,
+    }
+)
+DetectionXAIMethods = frozenset(
+    {
+        Method.DETCLASSPROBABILITYMAP,
+    }
+)
@@ -5,23 +5,38 @@ Common functionality.
 """
 import logging
 import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Tuple
-from urllib.request import urlretrieve
+from urllib.request import urlopen
 
+import cv2
 import numpy as np
 import openvino.runtime as ov
+from scipy.special import expit
 
 logger = logging.getLogger("openvino_xai")
-handler = logging.StreamHandler()
-formatter = logging.Formatter("%(levelname)s:%(name)s:%(message)s")
-handler.setFormatter(formatter)
-logger.addHandler(handler)
-logger.setLevel(logging.INFO)
+if not logger.handlers:
+    # Avoid stacking duplicated handlers (and duplicated messages) when the module is reloaded
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(levelname)s:%(name)s:%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
 
 
 SALIENCY_MAP_OUTPUT_NAME = "saliency_map"
 
+# Per-map LUT has fixed build and call cost, which pays off for maps starting from 64x64
+_MIN_LUT_SCALING_MAP_SIZE = 64 * 64
+
+
+@lru_cache(maxsize=None)
+def get_core() -> ov.Core:
+    """Returns OpenVINO Core shared within the process, so that device plugins are initialized only once."""
+    return ov.Core()
+
 
 def has_xai(model: ov.Model) -> bool:
     """
@@ -42,42 +57,85 @@ def has_xai(model: ov.Model) -> bool:
 # Not a part of product
 def retrieve_otx_model(data_dir: str | Path, model_name: str, dir_url=None) -> None:
     destination_folder = Path(data_dir) / "otx_models"
-    os.makedirs(destination_folder, exist_ok=True)
+    destination_folder.mkdir(parents=True, exist_ok=True)
     if dir_url is None:
         dir_url = f"https://storage.openvinotoolkit.org/repositories/model_api/test/otx_models/{model_name}"
         snapshot_file = "openvino"
     else:
         snapshot_file = model_name
 
+    downloads = []
     for post_fix in ["xml", "bin"]:
-        if not os.path.isfile(os.path.join(destination_folder, model_name + f".{post_fix}")):
-            urlretrieve(  # nosec B310
-                f"{dir_url}/{snapshot_file}.{post_fix}",
-                f"{destination_folder}/{model_name}.{post_fix}",
-            )
+        destination_file = destination_folder / f"{model_name}.{post_fix}"
+        if not destination_file.is_file():
+            downloads.append((f"{dir_url}/{snapshot_file}.{post_fix}", destination_file))
+
+    # Fetch .xml and .bin concurrently
+    with ThreadPoolExecutor(max_workers=max(len(downloads), 1)) as executor:
+        for future in [executor.submit(_download_file, url, file) for url, file in downloads]:
+            future.result()
+
+
+def _download_file(url: str, destination_file: Path, chunk_size: int = 1 << 20) -> None:
+    """Streams url content to the file. Partially downloaded file is not left at the destination on failure."""
+    # Temporary file is unique per process, so that concurrent downloads (e.g. pytest-xdist workers) do not clash
+    tmp_file = destination_file.with_name(f"{destination_file.name}.{os.getpid()}.part")
+    try:
+        with urlopen(url) as response, open(tmp_file, "wb") as f:  # nosec B310
+            shutil.copyfileobj(response, f, chunk_size)
+        tmp_file.replace(destination_file)
+    finally:
+        tmp_file.unlink(missing_ok=True)
 
 
 def scaling(saliency_map: np.ndarray, cast_to_uint8: bool = True, max_value: int = 255) -> np.ndarray:
     """Scaling saliency maps to [0, max_value] range."""
-    original_num_dims = saliency_map.ndim
-    if original_num_dims == 2:
+    original_shape = saliency_map.shape
+    if saliency_map.ndim == 2:
         # If input map is 2D array, add dim so that below code would work
         saliency_map = saliency_map[np.newaxis, ...]
 
-    saliency_map = saliency_map.astype(np.float32)
-    num_maps, h, w = saliency_map.shape
-    saliency_map = saliency_map.reshape((num_maps, h * w))
-
+    num_maps = saliency_map.shape[0]
+    saliency_map = saliency_map.reshape((num_maps, -1))
     min_values, max_values = get_min_max(saliency_map)
-    saliency_map = max_value * (saliency_map - min_values[:, None]) / (max_values - min_values + 1e-12)[:, None]
-    saliency_map = saliency_map.reshape(num_maps, h, w)
-
-    if original_num_dims == 2:
-        saliency_map = np.squeeze(saliency_map)
 
-    if cast_to_uint8:
-        return saliency_map.astype(np.uint8)
-    return saliency_map
+    if cast_to_uint8 and saliency_map.dtype == np.uint8:
+        # Fast path for uint8 maps which are already scaled (e.g. by the scaling embedded into the model)
+        # or constant, no float32 round-trip is needed for them
+        is_constant = min_values == max_values
+        if np.all(is_constant | ((min_values == 0) & (max_values == max_value))):
+            out = saliency_map.copy()
+            out[is_constant] = 0
+            return out.reshape(original_shape)
+        if saliency_map.shape[1] >= _MIN_LUT_SCALING_MAP_SIZE:
+            return _scaling_uint8_lut(saliency_map, min_values, max_values, max_value).reshape(original_shape)
+
+    # Single float32 working buffer, filled by the min subtraction (cast fused in), all the following ops are in-place
+    min_values, max_values = min_values.astype(np.float32), max_values.astype(np.float32)
+    saliency_map = np.subtract(saliency_map, min_values[:, None], dtype=np.float32)
+    saliency_map *= max_value
+
+    # Write the result straight into the output buffer, skipping the extra float32 -> uint8 copy
+    out = np.empty_like(saliency_map, dtype=np.uint8) if cast_to_uint8 else saliency_map
+    np.divide(saliency_map, (max_values - min_values + 1e-12)[:, None], out=out, casting="unsafe")
+    return out.reshape(original_shape)
+
+
+def _scaling_uint8_lut(
+    saliency_map: np.ndarray, min_values: np.ndarray, max_values: np.ndarray, max_value: int
+) -> np.ndarray:
+    """
+    Scales uint8 maps of shape (N, -1) with per-map 256-entry lookup tables, a byte gather per pixel.
+    LUTs are computed with the same float32 ops as the generic path, so the results are bitwise equal.
+    """
+    min_values, max_values = min_values.astype(np.float32), max_values.astype(np.float32)
+    luts = np.arange(256, dtype=np.float32) - min_values[:, None]
+    luts *= max_value
+    luts = np.divide(luts, (max_values - min_values + 1e-12)[:, None], dtype=np.float32).astype(np.uint8)
+    out = np.empty_like(saliency_map)
+    for map_, lut, out_map in zip(saliency_map, luts, out):
+        cv2.LUT(map_, lut, dst=out_map)
+    return out
 
 
 def get_min_max(saliency_map: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
@@ -87,15 +145,40 @@ def get_min_max(saliency_map: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
     return min_values, max_values
 
 
-def sigmoid(x: np.ndarray) -> np.ndarray:
-    """Compute sigmoid values of x."""
-    return 1 / (1 + np.exp(-x))
+def _as_float_array(x: np.ndarray, copy: bool) -> np.ndarray:
+    """Returns float array of at least float32 precision, copied if requested or if x has to be converted."""
+    # Integer logits (e.g. of quantized models) are promoted to float32, not to float16 with precision loss
+    return np.array(x, dtype=np.result_type(x, np.float32), copy=copy)
+
+
+def sigmoid(x: np.ndarray, copy: bool = True) -> np.ndarray:
+    """
+    Compute sigmoid values of x.
+
+    :param x: Input array.
+    :type x: np.ndarray
+    :param copy: If False, float input is overwritten with the result to avoid allocations.
+    :type copy: bool
+    """
+    x = _as_float_array(x, copy)
+    # Single fused ufunc, which also does not overflow on large negative inputs unlike 1 / (1 + exp(-x))
+    return expit(x, out=x)
 
 
-def softmax(x: np.ndarray) -> np.ndarray:
-    """Compute softmax values of x."""
-    e_x = np.exp(x - np.max(x))
-    return e_x / e_x.sum()
+def softmax(x: np.ndarray, copy: bool = True) -> np.ndarray:
+    """
+    Compute softmax values of x along the last axis.
+
+    :param x: Input array.
+    :type x: np.ndarray
+    :param copy: If False, float input is overwritten with the result to avoid allocations.
+    :type copy: bool
+    """
+    x = _as_float_array(x, copy)
+    x -= np.max(x, axis=-1, keepdims=True)
+    np.exp(x, out=x)
+    x /= np.sum(x, axis=-1, keepdims=True)
+    return x
 
 
 class IdentityPreprocessFN:
@@ -111,18 +194,34 @@ def is_bhwc_layout(image: np.array) -> bool:
     return False
 
 
-def format_to_bhwc(image: np.ndarray) -> np.ndarray:
-    """Format image to BHWC from ndim=3 or ndim=4."""
+def format_to_bhwc(image: np.ndarray, is_bhwc: bool | None = None) -> np.ndarray:
+    """
+    Format image to BHWC from ndim=3 or ndim=4.
+
+    :param image: Input image.
+    :type image: np.ndarray
+    :param is_bhwc: Layout of the image, if known beforehand. Estimated from the image shape if None.
+    :type is_bhwc: bool | None
+    """
     if image.ndim == 3:
         image = np.expand_dims(image, axis=0)
-    if not is_bhwc_layout(image):
+    if is_bhwc is None:
+        is_bhwc = is_bhwc_layout(image)
+    if not is_bhwc:
         # bchw layout -> bhwc
         image = image.transpose((0, 2, 3, 1))
     return image
 
 
-def infer_size_from_image(image: np.ndarray) -> Tuple[int, int]:
-    """Estimate image size."""
+def infer_size_from_image(image: np.ndarray, is_bhwc: bool | None = None) -> Tuple[int, int]:
+    """
+    Estimate image size.
+
+    :param image: Input image.
+    :type image: np.ndarray
+    :param is_bhwc: Layout of the image, if known beforehand. Estimated from the image shape if None.
+    :type is_bhwc: bool | None
+    """
     if image.ndim not in [2, 3, 4]:
         raise ValueError(f"Supports only two, three, and four dimensional image, but got {image.ndim}.")
 
@@ -131,8 +230,10 @@ def infer_size_from_image(image: np.ndarray) -> Tuple[int, int]:
 
     if image.ndim == 3:
         image = np.expand_dims(image, axis=0)
+    if is_bhwc is None:
+        is_bhwc = is_bhwc_layout(image)
     _, dim0, dim1, dim2 = image.shape
-    if dim0 > dim2 and dim1 > dim2:  # bhwc layout:
+    if is_bhwc:
         return dim0, dim1
     else:
         return dim1, dim2
@@ -9,18 +9,15 @@ import numpy as np
 import openvino as ov
 
 from openvino_xai import Task
-from openvino_xai.common.parameters import Method
+from openvino_xai.common.parameters import BlackBoxXAIMethods, Method
 from openvino_xai.common.utils import (
     IdentityPreprocessFN,
+    get_core,
     infer_size_from_image,
     logger,
 )
 from openvino_xai.explainer.explanation import Explanation
-from openvino_xai.explainer.utils import (
-    convert_targets_to_numpy,
-    explains_all,
-    get_target_indices,
-)
+from openvino_xai.explainer.utils import get_target_indices, normalize_targets
 from openvino_xai.explainer.visualizer import Visualizer
 from openvino_xai.methods.base import MethodBase
 from openvino_xai.methods.black_box.base import BlackBoxXAIMethod
@@ -84,7 +81,7 @@ class Explainer:
         **kwargs,
     ) -> None:
         if isinstance(model, (str, PathLike)):
-            model = ov.Core().read_model(model)
+            model = get_core().read_model(model)
 
         self.model = model
         self.compiled_model: ov.CompiledModel | None = None
@@ -128,10 +125,13 @@ class Explainer:
         elif self.explain_mode == ExplainMode.BLACKBOX:
             return self._create_black_box_method(task)
         elif self.explain_mode == ExplainMode.AUTO:
+            if self.explain_method in BlackBoxXAIMethods:
+                # No need to try white-box insertion for the black-box method
+                return self._create_black_box_method(task)
             try:
                 return self._create_white_box_method(task)
             except Exception as e:
-                logger.info(f"Failed to insert XAI into the model -> {e} Using black-box mode.")
+                logger.info("Failed to insert XAI into the model -> %s Using black-box mode.", e)
                 return self._create_black_box_method(task)
         else:
             raise ValueError(f"Not supported explain mode {self.explain_mode}.")
@@ -203,10 +203,10 @@ class Explainer:
         :parameter overlay_weight: Weight of the saliency map when overlaying the input data with the saliency map.
         :type overlay_weight: float
         """
-        targets = convert_targets_to_numpy(targets)
+        targets, explain_all_targets = normalize_targets(targets)
 
         target_indices = None
-        if isinstance(self.method, BlackBoxXAIMethod) and not explains_all(targets):
+        if isinstance(self.method, BlackBoxXAIMethod) and not explain_all_targets:
             target_indices = get_target_indices(
                 targets,
                 label_names,
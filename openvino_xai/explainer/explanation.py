@@ -13,9 +13,9 @@ import numpy as np
 from openvino_xai.common.parameters import Task
 from openvino_xai.common.utils import logger
 from openvino_xai.explainer.utils import (
-    convert_targets_to_numpy,
     explains_all,
     get_target_indices,
+    normalize_targets,
 )
 
 
@@ -39,7 +39,7 @@ class Explanation:
         label_names: List[str] | None = None,
         metadata: Dict[Task, Any] | None = None,
     ):
-        targets = convert_targets_to_numpy(targets)
+        targets, explain_all_targets = normalize_targets(targets)
 
         if isinstance(saliency_map, np.ndarray):
             self._check_saliency_map(saliency_map)
@@ -56,7 +56,7 @@ class Explanation:
         else:
             self.layout = Layout.MULTIPLE_MAPS_PER_IMAGE_GRAY
 
-        if not explains_all(targets) and not self.layout == Layout.ONE_MAP_PER_IMAGE_GRAY:
+        if not explain_all_targets and not self.layout == Layout.ONE_MAP_PER_IMAGE_GRAY:
             self._saliency_map = self._select_target_saliency_maps(targets, label_names)
 
         self.label_names = label_names
@@ -223,12 +223,14 @@ class Explanation:
                 if target_index in self.saliency_map:
                     checked_targets.append(target_index)
                 else:
-                    logger.info(f"Provided class index {target_index} is not available among saliency maps.")
+                    logger.info("Provided class index %s is not available among saliency maps.", target_index)
 
         if len(checked_targets) > max_num_plots:
             logger.warning(
-                f"Decrease the number of plotted saliency maps from {len(checked_targets)} to {max_num_plots}"
-                " to avoid the memory issue. To avoid this, increase the 'max_num_plots' argument."
+                "Decrease the number of plotted saliency maps from %d to %d"
+                " to avoid the memory issue. To avoid this, increase the 'max_num_plots' argument.",
+                len(checked_targets),
+                max_num_plots,
             )
             checked_targets = checked_targets[:max_num_plots]
 
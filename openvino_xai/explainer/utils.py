@@ -10,11 +10,35 @@ import numpy as np
 from openvino_xai.common.utils import sigmoid, softmax
 
 
-def convert_targets_to_numpy(targets):
-    targets = np.asarray(targets)
-    if targets.ndim > 1:
-        raise ValueError(f"targets expected to be at most 1-dimentional, but got {targets.ndim}.")
-    return np.atleast_1d(targets)
+def normalize_targets(targets: np.ndarray | List[int | str] | int | str) -> Tuple[np.ndarray, bool]:
+    """
+    Converts targets to 1-dimensional numpy array and checks if all classes/labels are requested to be explained.
+    Common user inputs (int, str, list of int) are dispatched by type, without numpy type inference.
+
+    :param targets: List of custom labels to explain. Can be list of integer indices (int),
+        or list of names (str) from label_names.
+    :type targets: np.ndarray | List[int | str] | int | str
+    :return: Targets as 1-dimensional numpy array and flag, which is True if all classes/labels are requested.
+    """
+    if isinstance(targets, int):
+        return np.array([targets], dtype=np.int64), targets == -1
+    if isinstance(targets, str):
+        return np.array([targets]), targets == "-1"
+    if isinstance(targets, (list, tuple)) and targets and isinstance(targets[0], int):
+        targets_np = np.fromiter(targets, dtype=np.int64, count=len(targets))
+        return targets_np, len(targets) == 1 and targets[0] == -1
+
+    targets_np = np.asarray(targets)
+    if targets_np.ndim > 1:
+        raise ValueError(f"targets expected to be at most 1-dimentional, but got {targets_np.ndim}.")
+    targets_np = np.atleast_1d(targets_np)
+    return targets_np, targets_np.size == 1 and explains_all(targets_np.item())
+
+
+def convert_targets_to_numpy(targets: np.ndarray | List[int | str] | int | str) -> np.ndarray:
+    """Converts targets to 1-dimensional numpy array."""
+    targets, _ = normalize_targets(targets)
+    return targets
 
 
 def get_target_indices(
@@ -33,7 +57,7 @@ def get_target_indices(
     targets = convert_targets_to_numpy(targets)
 
     if not isinstance(targets[0], str) and np.issubdtype(targets[0], np.integer):
-        return targets  # type: ignore
+        return np.ascontiguousarray(targets, dtype=np.int64)  # type: ignore
 
     if not isinstance(targets[0], str):
         raise ValueError(f"Explain labels expected to be int or str, but got {type(targets[0])}")
@@ -41,11 +65,9 @@ def get_target_indices(
     if not label_names:
         raise ValueError("Label names should be provided when targets contain string names.")
 
-    # Assuming len(targets) << len(label_names)
-    target_indices = []
-    for label_index, label in enumerate(label_names):
-        if label in targets:
-            target_indices.append(label_index)
+    # Vectorized membership test, keeps the order of label_names
+    labels_arr = np.asarray(label_names)
+    target_indices = np.flatnonzero(np.isin(labels_arr, targets)).tolist()
 
     if len(targets) != len(target_indices):
         raise ValueError("No all label names found in label_names. Check spelling.")
@@ -77,26 +99,33 @@ def preprocess_fn(
     expand_zero_dim: bool = True,
 ) -> np.ndarray:
     """Preprocess function."""
-    # Change color channel order
-    if change_channel_order:
-        x = x[:, :, ::-1]
-
-    # Resize
+    # Resize (per-channel op, so it is applied first on the contiguous input image)
     if input_size:
         x = cv2.resize(src=x, dsize=input_size)
 
-    # Normalize
-    x = (x - mean) / std
+    # Change color channel order (view)
+    if change_channel_order:
+        x = x[:, :, ::-1]
 
-    # Change layout HxWxC => CxHxW
+    # Change layout HxWxC => CxHxW (view)
     if hwc_to_chw:
         x = x.transpose((2, 0, 1))
+        # Per-channel constants to CxHxW, no-op for the ones already reshaped by get_preprocess_fn
+        if np.ndim(mean) == 1:
+            mean = np.reshape(mean, (-1, 1, 1))
+        if np.ndim(std) == 1:
+            std = np.reshape(std, (-1, 1, 1))
+
+    # Normalize, materializing channel swap and layout change in a single contiguous output buffer
+    out = np.empty(x.shape, dtype=np.float32)
+    np.subtract(x, mean, out=out)
+    np.divide(out, std, out=out)
 
     # Add batch dim
     if expand_zero_dim:
-        x = np.expand_dims(x, 0)
+        out = out[np.newaxis]
 
-    return x
+    return out
 
 
 def get_preprocess_fn(
@@ -108,6 +137,12 @@ def get_preprocess_fn(
     expand_zero_dim: bool = True,
 ) -> Callable[[Any], np.ndarray]:
     """Returns partially initialized preprocess_fn."""
+    # Bake normalization constants in the output dtype and layout once, instead of converting them per call
+    mean = np.asarray(mean, dtype=np.float32)
+    std = np.asarray(std, dtype=np.float32)
+    if hwc_to_chw:
+        mean = mean.reshape((-1, 1, 1))
+        std = std.reshape((-1, 1, 1))
     return partial(
         preprocess_fn,
         change_channel_order=change_channel_order,
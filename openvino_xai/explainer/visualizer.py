@@ -1,6 +1,9 @@
 # Copyright (C) 2023-2024 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Any, Dict, List, Tuple
 
 import cv2
@@ -23,45 +26,105 @@ def resize(saliency_map: np.ndarray, output_size: Tuple[int, int]) -> np.ndarray
     if saliency_map.ndim == 2:
         return cv2.resize(saliency_map, output_size[::-1])
 
-    x = saliency_map.transpose((1, 2, 0))
-    # Resizing in batches to prevent memory issue for saliency maps with many
-    # (targets=all classes scenario)
-    batch_size = 500
-    channels = x.shape[-1]
-    resized_batches = []
-    for start_idx in range(0, channels, batch_size):
-        end_idx = min(start_idx + batch_size, channels)
-        batch = x[:, :, start_idx:end_idx]
-        resized_batch = cv2.resize(batch, output_size[::-1])
+    # Resize map by map straight into the preallocated output, which avoids transposing the maps to
+    # the channel-last layout and back, and concatenation of resized batches of channels
+    # (also no memory issue for saliency maps with many channels, targets=all classes scenario)
+    resized = np.empty((saliency_map.shape[0], *output_size), dtype=saliency_map.dtype)
+    for class_map, resized_map in zip(saliency_map, resized):
+        cv2.resize(class_map, output_size[::-1], dst=resized_map)
+    return resized
 
-        # Ensure resized batch has three dimensions
-        if resized_batch.ndim == 2:
-            resized_batch = np.expand_dims(resized_batch, axis=2)
-        resized_batches.append(resized_batch)
 
-    x = np.concatenate(resized_batches, axis=-1)
-    return x.transpose((2, 0, 1))
+_NUM_WORKERS = min(os.cpu_count() or 1, 8)
+
+
+@lru_cache(maxsize=None)
+def _get_thread_pool() -> ThreadPoolExecutor:
+    """Returns thread pool shared within the process, created on the first use."""
+    return ThreadPoolExecutor(max_workers=_NUM_WORKERS, thread_name_prefix="openvino_xai_visualizer")
+
+
+@lru_cache(maxsize=None)
+def _get_colormap_lut(colormap_type: int) -> np.ndarray:
+    """Returns (256, 1, 3) lookup table of the OpenCV colormap in RGB order, as expected by cv2.LUT."""
+    lut = cv2.applyColorMap(np.arange(256, dtype=np.uint8), colormap_type)  # OpenCV: BGR order
+    return np.ascontiguousarray(lut[:, :, ::-1])
+
+
+def _apply_colormap_lut(saliency_map: np.ndarray, lut: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    """Looks up colors of uint8 saliency map (..., W) with a single cv2.LUT call, writes to out (..., W, 3)."""
+    # Maps are packed as rows of one 3-channel image, so that the vectorized cv2.LUT processes all of them at once
+    rows = saliency_map.reshape(-1, saliency_map.shape[-1])
+    if out is None:
+        out = np.empty((*saliency_map.shape, 3), dtype=np.uint8)
+    cv2.LUT(cv2.merge([rows, rows, rows]), lut, dst=out.reshape(*rows.shape, 3))
+    return out
 
 
 def colormap(saliency_map: np.ndarray, colormap_type: int = cv2.COLORMAP_JET) -> np.ndarray:
     """Applies colormap to the saliency map."""
-    # Note: inefficient operation. Is there a way to vectorize it?
-    color_mapped_saliency_map = []
-    for class_map in saliency_map:
-        colormapped = cv2.applyColorMap(class_map, colormap_type)  # OpenCV: BGR order
-        colormapped_rgb = cv2.cvtColor(colormapped, code=cv2.COLOR_BGR2RGB)
-        color_mapped_saliency_map.append(colormapped_rgb)
-    return np.array(color_mapped_saliency_map)
+    # Colormap of uint8 map is a per-pixel lookup, all the maps are processed by a single table lookup
+    return _apply_colormap_lut(saliency_map, _get_colormap_lut(colormap_type))
+
+
+def resize_scale_colormap(
+    saliency_map: np.ndarray,
+    output_size: Tuple[int, int],
+    colormap_type: int = cv2.COLORMAP_JET,
+    batch_size: int = 64,
+) -> np.ndarray:
+    """
+    Resizes, scales and applies colormap to the saliency maps (N, H, W) in a single pass.
+    Equivalent to colormap(scaling(resize(saliency_map, output_size))), but maps are processed in batches,
+    which keep intermediate buffers small (cache friendly) and written directly into the preallocated output.
+    """
+    num_maps = saliency_map.shape[0]
+    lut = _get_colormap_lut(colormap_type)
+    out = np.empty((num_maps, *output_size, 3), dtype=np.uint8)
+
+    def process_batch(start_idx: int) -> None:
+        end_idx = min(start_idx + batch_size, num_maps)
+        batch = scaling(resize(saliency_map[start_idx:end_idx], output_size))
+        _apply_colormap_lut(batch, lut, out=out[start_idx:end_idx])
+
+    batch_starts = range(0, num_maps, batch_size)
+    if len(batch_starts) > 1 and _NUM_WORKERS > 1:
+        # Batches are independent and written to disjoint parts of the output,
+        # OpenCV and NumPy kernels release the GIL, so batches are processed concurrently
+        for _ in _get_thread_pool().map(process_batch, batch_starts):
+            pass
+    else:
+        for start_idx in batch_starts:
+            process_batch(start_idx)
+    return out
 
 
 def overlay(
-    saliency_map: np.ndarray, input_image: np.ndarray, overlay_weight: float = 0.5, cast_to_uint8: bool = True
+    saliency_map: np.ndarray,
+    input_image: np.ndarray,
+    overlay_weight: float = 0.5,
+    cast_to_uint8: bool = True,
+    out: np.ndarray | None = None,
 ) -> np.ndarray:
-    """Applies overlay of the saliency map with the original image."""
+    """
+    Applies overlay of the saliency map with the original image.
+    If out is provided, the result is written to it, e.g. to saliency_map itself to overlay in-place.
+    """
+    if cast_to_uint8 and saliency_map.dtype == np.uint8 and input_image.dtype == np.uint8:
+        # Single saturating uint8 kernel per map, without float intermediates, clipping and casting passes
+        input_image = np.broadcast_to(input_image, saliency_map.shape)
+        res = np.empty_like(saliency_map) if out is None else out
+        for image, class_map, overlaid_map in zip(input_image, saliency_map, res):
+            cv2.addWeighted(image, overlay_weight, class_map, 1 - overlay_weight, 0, dst=overlaid_map)
+        return res
+
     res = input_image * overlay_weight + saliency_map * (1 - overlay_weight)
     res[res > 255] = 255
     if cast_to_uint8:
-        return res.astype(np.uint8)
+        res = res.astype(np.uint8)
+    if out is not None:
+        out[...] = res
+        return out
     return res
 
 
@@ -142,20 +205,26 @@ class Visualizer:
         if overlay:
             if original_input_image is None:
                 raise ValueError("Input data has to be provided for overlay.")
-            saliency_map_np = self._apply_resize(explanation, saliency_map_np, original_input_image, output_size)
-            saliency_map_np = self._apply_colormap(explanation, saliency_map_np)
+            saliency_map_np = self._apply_resize_colormap(
+                explanation, saliency_map_np, original_input_image, output_size
+            )
             saliency_map_np = self._apply_overlay(
                 explanation, saliency_map_np, original_input_image, output_size, overlay_weight
             )
             saliency_map_np = self._apply_metadata(explanation.metadata, saliency_map_np, indices_to_return)
         else:
-            if resize:
-                if original_input_image is None and output_size is None:
-                    raise ValueError(
-                        "Input data or output_size has to be provided for resize (for target size estimation)."
-                    )
+            if resize and original_input_image is None and output_size is None:
+                raise ValueError(
+                    "Input data or output_size has to be provided for resize (for target size estimation)."
+                )
+            if resize and colormap:
+                # Fused resize -> scaling -> colormap
+                saliency_map_np = self._apply_resize_colormap(
+                    explanation, saliency_map_np, original_input_image, output_size
+                )
+            elif resize:
                 saliency_map_np = self._apply_resize(explanation, saliency_map_np, original_input_image, output_size)
-            if colormap:
+            elif colormap:
                 saliency_map_np = self._apply_colormap(explanation, saliency_map_np)
 
         # Convert back to dict
@@ -206,12 +275,31 @@ class Visualizer:
                 f"Saliency map to resize has to be grayscale. The layout must be in {GRAY_LAYOUTS}, "
                 f"but got {explanation.layout}."
             )
-        output_size = output_size if output_size else infer_size_from_image(original_input_image)
+        # original_input_image is already formatted to BHWC in visualize()
+        output_size = output_size if output_size else infer_size_from_image(original_input_image, is_bhwc=True)
         saliency_map_np = resize(saliency_map_np, output_size)
 
         # Scaling has to be applied after resize to keep map in range 0..255
         return self._apply_scaling(explanation, saliency_map_np)
 
+    def _apply_resize_colormap(
+        self,
+        explanation: Explanation,
+        saliency_map_np: np.ndarray,
+        original_input_image: np.ndarray = None,
+        output_size: Tuple[int, int] = None,
+    ) -> np.ndarray:
+        if explanation.layout not in GRAY_LAYOUTS:
+            raise ValueError(
+                f"Saliency map to resize has to be grayscale. The layout must be in {GRAY_LAYOUTS}, "
+                f"but got {explanation.layout}."
+            )
+        # original_input_image is already formatted to BHWC in visualize()
+        output_size = output_size if output_size else infer_size_from_image(original_input_image, is_bhwc=True)
+        saliency_map_np = resize_scale_colormap(saliency_map_np, output_size)
+        self._update_layout_to_color(explanation)
+        return saliency_map_np
+
     @staticmethod
     def _apply_colormap(explanation: Explanation, saliency_map_np: np.ndarray) -> np.ndarray:
         if saliency_map_np.dtype != np.uint8:
@@ -222,11 +310,15 @@ class Visualizer:
                 f"but got {explanation.layout}."
             )
         saliency_map_np = colormap(saliency_map_np)
+        Visualizer._update_layout_to_color(explanation)
+        return saliency_map_np
+
+    @staticmethod
+    def _update_layout_to_color(explanation: Explanation) -> None:
         if explanation.layout == Layout.ONE_MAP_PER_IMAGE_GRAY:
             explanation.layout = Layout.ONE_MAP_PER_IMAGE_COLOR
         if explanation.layout == Layout.MULTIPLE_MAPS_PER_IMAGE_GRAY:
             explanation.layout = Layout.MULTIPLE_MAPS_PER_IMAGE_COLOR
-        return saliency_map_np
 
     @staticmethod
     def _apply_overlay(
@@ -241,7 +333,8 @@ class Visualizer:
         if output_size:
             original_input_image = cv2.resize(original_input_image[0], output_size[::-1])
             original_input_image = original_input_image[None, ...]
-        return overlay(saliency_map_np, original_input_image, overlay_weight)
+        # Colormapped maps are created by the preceding step, so they are overlaid in-place
+        return overlay(saliency_map_np, original_input_image, overlay_weight, out=saliency_map_np)
 
     @staticmethod
     def _update_explanation_with_processed_sal_map(
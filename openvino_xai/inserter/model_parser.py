@@ -2,7 +2,7 @@
 # SPDX-License-Identifier: Apache-2.0
 
 from enum import Enum
-from typing import Callable, List
+from typing import Callable, Iterable, List
 
 import openvino.runtime as ov
 
@@ -23,8 +23,8 @@ class IRParser:
         return logit_node
 
     @staticmethod
-    def get_node_by_condition(ops: List[ov.Node], condition: Callable, k: int = 1):
-        """Returns k-th node, which satisfies the condition."""
+    def get_node_by_condition(ops: Iterable[ov.Node], condition: Callable, k: int = 1):
+        """Returns k-th node, which satisfies the condition. Ops are consumed lazily until the node is found."""
         for op in ops:
             if condition(op):
                 k -= 1
@@ -59,32 +59,30 @@ class IRParser:
 
     @staticmethod
     def _is_op_w_single_spacial_output(op: ov.Node) -> bool:
+        # Cheapest checks first, each call here is a round trip into OpenVINO runtime
         if op.get_type_name() == "Constant":
             return False
-        if len(op.outputs()) > 1:
+        if op.get_output_size() > 1:
             return False
-        node_out_shape = op.output(0).partial_shape
+        node_out_shape = op.get_output_partial_shape(0)
         if node_out_shape.rank.get_length() != 4:
             return False
         if not (node_out_shape[0].is_dynamic or node_out_shape[0].get_length() == 1):
             return False
-        c = node_out_shape[1].get_length()
-        h = node_out_shape[2].get_length()
-        w = node_out_shape[3].get_length()
+        c, h, w = (node_out_shape[i].get_length() for i in (1, 2, 3))
         if not (1 < h < c and 1 < w < c):
             return False
         return True
 
     @staticmethod
     def _has_spacial_size(node: ov.Node, output_id: int = 0) -> bool:
-        node_out_shape = node.output(output_id).partial_shape
+        node_out_shape = node.get_output_partial_shape(output_id)
+        dim1, dim2, dim3 = (node_out_shape[i].get_length() for i in (1, 2, 3))
 
         # NCHW
-        h = node_out_shape[2].get_length()
-        w = node_out_shape[3].get_length()
+        h, w = dim2, dim3
         # NHWC
-        h_ = node_out_shape[1].get_length()
-        w_ = node_out_shape[2].get_length()
+        h_, w_ = dim1, dim2
         return (h != 1 and w != 1) or (h_ != 1 and w_ != 1)
 
     @staticmethod
@@ -111,7 +109,7 @@ class IRParserCls(IRParser):
     @classmethod
     def get_logit_node(cls, model: ov.Model, output_id=0, search_softmax=False) -> ov.Node:
         if search_softmax:
-            reversed_ops = model.get_ordered_ops()[::-1]
+            reversed_ops = reversed(model.get_ordered_ops())
             softmax_node = cls.get_node_by_condition(reversed_ops, lambda x: x.get_type_name() == "Softmax")
             if softmax_node and len(softmax_node.get_output_partial_shape(0)) == 2:
                 logit_node = softmax_node.input(0).get_source_output().get_node()
@@ -134,7 +132,7 @@ class IRParserCls(IRParser):
         i.e. output of the target node is used to generate input for the downstream XAI branch.
         """
         if target_node_name:
-            reversed_ops = model.get_ordered_ops()[::-1]
+            reversed_ops = reversed(model.get_ordered_ops())
             target_node = cls.get_node_by_condition(reversed_ops, lambda x: x.get_friendly_name() == target_node_name)
             if target_node is not None:
                 return target_node
@@ -142,7 +140,7 @@ class IRParserCls(IRParser):
 
         if model_type == ModelType.CNN:
             # Make an attempt to search for last node with spacial dimensions
-            reversed_ops = model.get_ordered_ops()[::-1]
+            reversed_ops = reversed(model.get_ordered_ops())
             last_op_w_spacial_output = cls.get_node_by_condition(reversed_ops, cls._is_op_w_single_spacial_output, k)
             if last_op_w_spacial_output is not None:
                 return last_op_w_spacial_output
@@ -154,7 +152,7 @@ class IRParserCls(IRParser):
                 return target_node
 
         if model_type == ModelType.TRANSFORMER:
-            reversed_ops = model.get_ordered_ops()[::-1]
+            reversed_ops = reversed(model.get_ordered_ops())
             target_node = cls.get_node_by_condition(reversed_ops, cls._is_add_node_w_two_non_constant_inputs, k)
             if target_node is not None:
                 return target_node
@@ -177,7 +175,7 @@ class IRParserCls(IRParser):
 
         if model_type == ModelType.CNN:
             # Make an attempt to search for a last pooling node
-            reversed_ops = model.get_ordered_ops()[::-1]
+            reversed_ops = reversed(model.get_ordered_ops())
             last_pooling_node = cls.get_node_by_condition(reversed_ops, cls._is_pooling_node_wo_spacial_size)
             if last_pooling_node is not None:
                 return [last_pooling_node]
@@ -9,7 +9,7 @@ import numpy as np
 import openvino as ov
 
 from openvino_xai.common.parameters import Task
-from openvino_xai.common.utils import IdentityPreprocessFN
+from openvino_xai.common.utils import IdentityPreprocessFN, get_core
 
 
 class MethodBase(ABC):
@@ -48,5 +48,4 @@ class MethodBase(ABC):
         """Saliency map generation."""
 
     def load_model(self) -> None:
-        core = ov.Core()
-        self._model_compiled = core.compile_model(model=self._model, device_name=self._device_name)
+        self._model_compiled = get_core().compile_model(model=self._model, device_name=self._device_name)
@@ -2,12 +2,12 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import collections
-import math
 from abc import ABC, abstractmethod
-from typing import Callable, Dict, List, Mapping, Tuple
+from typing import Callable, Dict, List, Mapping, Sequence, Tuple
 
 import numpy as np
 import openvino.runtime as ov
+from openvino.runtime.utils.data_helpers import OVDict
 from scipy.optimize import direct
 
 from openvino_xai.common.utils import IdentityPreprocessFN
@@ -58,11 +58,13 @@ class AISEBase(BlackBoxXAIMethod, ABC):
         self.bounds = None
         self.preservation = True
         self.deletion = True
+        self._infer_queue: ov.AsyncInferQueue | None = None
 
         if prepare_model:
             self.prepare_model()
 
     def _run_synchronous_explanation(self) -> np.ndarray:
+        self._infer_queue = self._create_infer_queue()
         for kernel_width in self.kernel_widths:
             self._current_kernel_width = kernel_width
             self._run_optimization()
@@ -92,15 +94,23 @@ class AISEBase(BlackBoxXAIMethod, ABC):
         kernel_mask = self._mask_generator.generate_kernel_mask(kernel_params)
         kernel_mask = np.clip(kernel_mask, 0, 1)
 
-        pred_loss_preserve = 0.0
-        if self.preservation:
-            data_perturbed_preserve = self.data_preprocessed * kernel_mask
-            pred_loss_preserve = self._get_loss(data_perturbed_preserve)
-
-        pred_loss_delete = 0.0
-        if self.deletion:
-            data_perturbed_delete = self.data_preprocessed * (1 - kernel_mask)
-            pred_loss_delete = self._get_loss(data_perturbed_delete)
+        if self._infer_queue is not None:
+            # Preservation and deletion perturbations are independent, infer them in parallel
+            losses = [0.0, 0.0]
+            self._infer_queue.start_async(self.data_preprocessed * kernel_mask, userdata=(losses, 0))
+            self._infer_queue.start_async(self.data_preprocessed * (1 - kernel_mask), userdata=(losses, 1))
+            self._infer_queue.wait_all()
+            pred_loss_preserve, pred_loss_delete = losses
+        else:
+            pred_loss_preserve = 0.0
+            if self.preservation:
+                data_perturbed_preserve = self.data_preprocessed * kernel_mask
+                pred_loss_preserve = self._get_loss(data_perturbed_preserve)
+
+            pred_loss_delete = 0.0
+            if self.deletion:
+                data_perturbed_delete = self.data_preprocessed * (1 - kernel_mask)
+                pred_loss_delete = self._get_loss(data_perturbed_delete)
 
         loss = pred_loss_preserve - pred_loss_delete
 
@@ -109,20 +119,42 @@ class AISEBase(BlackBoxXAIMethod, ABC):
         loss *= -1  # Objective: minimize
         return loss
 
+    def _create_infer_queue(self) -> ov.AsyncInferQueue | None:
+        """
+        Creates infer queue for the preservation and deletion perturbations,
+        if both are used and the device can run several requests in parallel (e.g. throughput hint).
+        """
+        if not self._model_compiled:
+            raise RuntimeError("Model is not compiled. Call prepare_model() first.")
+        if not (self.preservation and self.deletion):
+            return None
+        if self._model_compiled.get_property("OPTIMAL_NUMBER_OF_INFER_REQUESTS") < 2:
+            return None
+        infer_queue = ov.AsyncInferQueue(self._model_compiled, 2)
+        infer_queue.set_callback(self._on_infer_done)
+        return infer_queue
+
+    def _on_infer_done(self, request: ov.InferRequest, userdata: Tuple[List[float], int]) -> None:
+        losses, index = userdata
+        losses[index] = self._get_loss_from_output(OVDict(request.results))
+
+    def _get_loss(self, data_perturbed: np.ndarray) -> float:
+        """Get loss for perturbed input."""
+        return self._get_loss_from_output(self.model_forward(data_perturbed, preprocess=False))
+
     @abstractmethod
-    def _get_loss(self, data_perturbed: np.array) -> float:
-        pass
+    def _get_loss_from_output(self, forward_output: Mapping) -> float:
+        """Get loss from the model output for perturbed input."""
 
     def _kernel_density_estimation(self) -> np.ndarray:
         """Aggregate the result per kernel with KDE."""
         saliency_map_per_kernel = np.zeros((len(self.kernel_widths), self.input_size[0], self.input_size[1]))
         for kernel_index, kernel_width in enumerate(self.kernel_widths):
-            kernel_masks_weighted = np.zeros(self.input_size)
-            for i in range(self.num_iterations_per_kernel):
-                kernel_params = self.kernel_params_hist[kernel_width][i]
-                kernel_mask = self._mask_generator.generate_kernel_mask(kernel_params)
-                score = self.pred_score_hist[kernel_width][i]
-                kernel_masks_weighted += kernel_mask * score
+            kernel_params = self.kernel_params_hist[kernel_width][: self.num_iterations_per_kernel]
+            scores = np.asarray(self.pred_score_hist[kernel_width][: self.num_iterations_per_kernel])
+            # Gaussian masks are separable, score-weighted sum of all the masks is a single (H, N) @ (N, W) product
+            rows, cols = self._mask_generator.generate_kernel_mask_factors(kernel_params)
+            kernel_masks_weighted = (rows * scores[:, np.newaxis]).T @ cols
             kernel_masks_weighted_max = kernel_masks_weighted.max()
             if kernel_masks_weighted_max > 0:
                 kernel_masks_weighted = kernel_masks_weighted / kernel_masks_weighted_max
@@ -136,23 +168,38 @@ class AISEBase(BlackBoxXAIMethod, ABC):
 class GaussianPerturbationMask:
     """
     Perturbation mask generator.
+    2D gaussian is separable, so masks are computed as outer products of 1D gaussians along height and width.
     """
 
     def __init__(self, input_size: Tuple[int, int]):
-        h = np.linspace(0, 1, input_size[0])
-        w = np.linspace(0, 1, input_size[1])
-        self.h, self.w = np.meshgrid(w, h)
+        self.h = np.linspace(0, 1, input_size[1])  # Coordinates along the width, paired with mh
+        self.w = np.linspace(0, 1, input_size[0])  # Coordinates along the height, paired with mw
 
-    def _get_2d_gaussian(self, gauss_params: Tuple[float, float, float]) -> np.ndarray:
-        mh, mw, sigma = gauss_params
-        A = 1 / (2 * math.pi * sigma * sigma)
-        B = (self.h - mh) ** 2 / (2 * sigma**2)
-        C = (self.w - mw) ** 2 / (2 * sigma**2)
-        return A * np.exp(-(B + C))
+    def generate_kernel_mask_factors(
+        self, gauss_params: Sequence[Tuple[float, float, float]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Generates 1D factors of 2D gaussian masks, normalized to the peak value of 1.
+        Mask i is np.outer(rows[i], cols[i]).
+
+        :param gauss_params: Gaussian parameters (mh, mw, sigma) of N masks.
+        :type gauss_params: Sequence[Tuple[float, float, float]]
+        :return: Row factors (N, H) and column factors (N, W).
+        """
+        mh, mw, sigma = np.asarray(gauss_params, dtype=np.float64).reshape(-1, 3).T[..., np.newaxis]
+        two_sigma_sq = 2 * sigma**2
+        rows = np.exp(-((self.w - mw) ** 2) / two_sigma_sq)
+        cols = np.exp(-((self.h - mh) ** 2) / two_sigma_sq)
+        # Peak of the outer product is the product of the factor peaks
+        rows /= rows.max(axis=1, keepdims=True)
+        cols /= cols.max(axis=1, keepdims=True)
+        return rows, cols
 
     def generate_kernel_mask(self, gauss_param: Tuple[float, float, float], scale: float = 1.0):
         """
         Generates 2D gaussian mask.
         """
-        gaussian = self._get_2d_gaussian(gauss_param)
-        return (gaussian / gaussian.max()) * scale
+        rows, cols = self.generate_kernel_mask_factors([gauss_param])
+        if scale != 1.0:
+            rows *= scale
+        return np.outer(rows[0], cols[0])
@@ -2,7 +2,7 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import collections
-from typing import Callable, Dict, List, Tuple
+from typing import Callable, Dict, List, Mapping, Tuple
 
 import numpy as np
 import openvino.runtime as ov
@@ -94,7 +94,7 @@ class AISEClassification(AISEBase):
         if target_indices is None:
             num_classes = self.get_num_classes(self.data_preprocessed)
             if num_classes > 10:
-                logger.info(f"num_classes = {num_classes}, which might take significant time to process.")
+                logger.info("num_classes = %d, which might take significant time to process.", num_classes)
             target_indices = list(range(num_classes))
 
         self.num_iterations_per_kernel, self.kernel_widths = self._preset_parameters(
@@ -145,10 +145,9 @@ class AISEClassification(AISEBase):
             kernel_widths = widths
         return num_iterations_per_kernel, kernel_widths
 
-    def _get_loss(self, data_perturbed: np.ndarray) -> float:
-        """Get loss for perturbed input."""
-        x = self.model_forward(data_perturbed, preprocess=False)
-        x = self.postprocess_fn(x)
+    def _get_loss_from_output(self, forward_output: Mapping) -> float:
+        """Get loss from the model output for perturbed input."""
+        x = self.postprocess_fn(forward_output)
         check_classification_output(x)
 
         if np.max(x) > 1 or np.min(x) < 0:
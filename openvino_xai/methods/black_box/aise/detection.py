@@ -2,7 +2,7 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import collections
-from typing import Any, Callable, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Mapping, Tuple
 
 import numpy as np
 import openvino.runtime as ov
@@ -103,7 +103,7 @@ class AISEDetection(AISEBase):
         if target_indices is None:
             num_boxes = len(boxes)
             if num_boxes > 10:
-                logger.info(f"num_boxes = {num_boxes}, which might take significant time to process.")
+                logger.info("num_boxes = %d, which might take significant time to process.", num_boxes)
             target_indices = list(range(num_boxes))
 
         self.num_iterations_per_kernel, self.divisors = self._preset_parameters(
@@ -182,9 +182,8 @@ class AISEDetection(AISEBase):
         y_to = min(target_box_scaled[3] + box_height * padding_coef, 1.0)
         self.bounds = Bounds([x_from, y_from], [x_to, y_to])
 
-    def _get_loss(self, data_perturbed: np.array) -> float:
-        """Get loss for perturbed input."""
-        forward_output = self.model_forward(data_perturbed, preprocess=False)
+    def _get_loss_from_output(self, forward_output: Mapping) -> float:
+        """Get loss from the model output for perturbed input."""
         boxes, scores, labels = self.postprocess_fn(forward_output)
         boxes, scores, labels = boxes[0], scores[0], labels[0]
 
@@ -1,14 +1,21 @@
 # Copyright (C) 2023-2024 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
+from functools import lru_cache
 from typing import Callable, Dict, List, Mapping, Tuple
 
 import cv2
 import numpy as np
 import openvino.runtime as ov
+from openvino.runtime.utils.data_helpers import OVDict
 from tqdm import tqdm
 
-from openvino_xai.common.utils import IdentityPreprocessFN, is_bhwc_layout, scaling
+from openvino_xai.common.utils import (
+    IdentityPreprocessFN,
+    infer_size_from_image,
+    is_bhwc_layout,
+    scaling,
+)
 from openvino_xai.methods.black_box.base import BlackBoxXAIMethod, Preset
 from openvino_xai.methods.black_box.utils import check_classification_output
 
@@ -84,7 +91,7 @@ class RISE(BlackBoxXAIMethod):
 
         num_masks = self._preset_parameters(preset, num_masks)
 
-        saliency_maps = self._run_synchronous_explanation(
+        saliency_maps = self._run_explanation(
             data_preprocessed,
             target_indices,
             num_masks,
@@ -121,7 +128,7 @@ class RISE(BlackBoxXAIMethod):
         else:
             raise ValueError(f"Preset {preset} is not supported.")
 
-    def _run_synchronous_explanation(
+    def _run_explanation(
         self,
         data_preprocessed: np.ndarray,
         target_classes: List[int] | None,
@@ -130,7 +137,9 @@ class RISE(BlackBoxXAIMethod):
         prob: float,
         seed: int,
     ) -> np.ndarray:
-        input_size = data_preprocessed.shape[1:3] if is_bhwc_layout(data_preprocessed) else data_preprocessed.shape[2:4]
+        # Layout is fixed for the whole explanation, estimate it once instead of per mask
+        is_bhwc = is_bhwc_layout(data_preprocessed)
+        input_size = infer_size_from_image(data_preprocessed, is_bhwc)
 
         num_classes = self.get_num_classes(data_preprocessed)
 
@@ -140,33 +149,96 @@ class RISE(BlackBoxXAIMethod):
             num_targets = len(target_classes)
 
         rand_generator = np.random.default_rng(seed=seed)
+        target_indices = None if target_classes is None else np.asarray(target_classes, dtype=np.int64)
 
-        saliency_maps = np.zeros((num_targets, input_size[0], input_size[1]))
-        for _ in tqdm(range(0, num_masks), desc="Explaining in synchronous mode"):
-            mask = self._generate_mask(input_size, num_cells, prob, rand_generator)
-            # Add channel dimensions for masks
-            if is_bhwc_layout(data_preprocessed):
-                masked = np.expand_dims(mask, 2) * data_preprocessed
-            else:
-                masked = mask * data_preprocessed
+        # float32 is enough for accumulation of the score-weighted [0, 1] masks, and halves the memory traffic
+        saliency_maps = np.zeros((num_targets, input_size[0], input_size[1]), dtype=np.float32)
+        saliency_maps_flat = saliency_maps.reshape(num_targets, -1)
+        # Scratch buffer for the weighted masks of a batch, so that no (T, H * W) temporary is allocated per batch
+        weighted_masks = np.empty_like(saliency_maps_flat)
 
-            forward_output = self.model_forward(masked, preprocess=False)
+        # Masks are generated and applied in batches. Masks and scores buffers are double-buffered:
+        # in asynchronous mode masks of the next batch are generated while the current batch is being inferred.
+        # Masked input buffer is reused right away, since input is copied to the infer request on submission.
+        batch_size = min(num_masks, 32)
+        masks = np.empty((2, batch_size, *input_size), dtype=np.float32)
+        scores = np.empty((2, batch_size, num_targets), dtype=np.float32)
+        masked = np.empty((batch_size, *data_preprocessed.shape[1:]), dtype=np.result_type(data_preprocessed, masks))
+
+        def postprocess_scores(forward_output: Mapping, mask_scores: np.ndarray) -> None:
             raw_scores = self.postprocess_fn(forward_output)
             check_classification_output(raw_scores)
+            self._get_scores(raw_scores, target_indices, out=mask_scores)
+
+        if not self._model_compiled:
+            raise RuntimeError("Model is not compiled. Call prepare_model() first.")
+        if self._model_compiled.get_property("OPTIMAL_NUMBER_OF_INFER_REQUESTS") > 1:
+            # Device can run several requests in parallel (e.g. throughput hint), infer masks asynchronously
+            mode = "asynchronous"
+            infer_queue = ov.AsyncInferQueue(self._model_compiled)
+            infer_queue.set_callback(
+                lambda request, mask_scores: postprocess_scores(OVDict(request.results), mask_scores)
+            )
+
+            def submit(batch_masked: np.ndarray, batch_scores: np.ndarray) -> None:
+                for masked_input, mask_scores in zip(batch_masked, batch_scores):
+                    infer_queue.start_async(masked_input[np.newaxis], userdata=mask_scores)
+
+            wait = infer_queue.wait_all
+        else:
+            mode = "synchronous"
+
+            def submit(batch_masked: np.ndarray, batch_scores: np.ndarray) -> None:
+                for masked_input, mask_scores in zip(batch_masked, batch_scores):
+                    postprocess_scores(self.model_forward(masked_input[np.newaxis], preprocess=False), mask_scores)
+
+            def wait() -> None:
+                pass
+
+        def accumulate(batch_masks: np.ndarray, batch_scores: np.ndarray) -> None:
+            # Accumulate score-weighted masks of the batch with a single GEMM, (T, B) @ (B, H * W)
+            num_batch_masks = len(batch_masks)
+            np.matmul(batch_scores.T, batch_masks.reshape(num_batch_masks, -1), out=weighted_masks)
+            np.add(saliency_maps_flat, weighted_masks, out=saliency_maps_flat)
+            progress_bar.update(num_batch_masks)
+
+        pending_batch = None
+        with tqdm(total=num_masks, desc=f"Explaining in {mode} mode") as progress_bar:
+            for batch_id, batch_start in enumerate(range(0, num_masks, batch_size)):
+                num_batch_masks = min(batch_size, num_masks - batch_start)
+                batch_masks = masks[batch_id % 2, :num_batch_masks]
+                batch_scores = scores[batch_id % 2, :num_batch_masks]
+                for mask in batch_masks:
+                    mask[...] = self._generate_mask(input_size, num_cells, prob, rand_generator)
+                # Add channel dimensions for masks
+                batch_masked = masked[:num_batch_masks]
+                if is_bhwc:
+                    np.multiply(batch_masks[..., np.newaxis], data_preprocessed, out=batch_masked)
+                else:
+                    np.multiply(batch_masks[:, np.newaxis], data_preprocessed, out=batch_masked)
+
+                # Scores of the previous batch are ready once its requests are completed
+                wait()
+                if pending_batch is not None:
+                    accumulate(*pending_batch)
 
-            sal = self._get_scored_mask(raw_scores, mask, target_classes)
-            saliency_maps += sal
+                submit(batch_masked, batch_scores)
+                pending_batch = batch_masks, batch_scores
+
+            wait()
+            if pending_batch is not None:
+                accumulate(*pending_batch)
 
         if target_classes is not None:
             saliency_maps = self._reformat_as_dict(saliency_maps, target_classes)
         return saliency_maps
 
     @staticmethod
-    def _get_scored_mask(raw_scores: np.ndarray, mask: np.ndarray, target_classes: List[int] | None) -> np.ndarray:
-        if target_classes is not None:
-            return np.take(raw_scores, target_classes).reshape(-1, 1, 1) * mask
-        else:
-            return raw_scores.reshape(-1, 1, 1) * mask
+    def _get_scores(raw_scores: np.ndarray, target_indices: np.ndarray | None, out: np.ndarray) -> np.ndarray:
+        if target_indices is not None:
+            return np.take(raw_scores, target_indices, out=out)
+        out[:] = raw_scores.reshape(-1)
+        return out
 
     @staticmethod
     def _reformat_as_dict(
@@ -182,7 +254,7 @@ class RISE(BlackBoxXAIMethod):
             mask (np.array): float mask from 0 to 1 with size of model input
         """
         cell_size = np.ceil(np.array(input_size) / num_cells)
-        up_size = np.array((num_cells + 1) * cell_size, dtype=np.uint32)
+        rows_interp, cols_interp = RISE._get_upsampling_matrices(tuple(input_size), num_cells)
 
         grid_size = (num_cells, num_cells)
         grid = rand_generator.random(grid_size) < prob
@@ -191,8 +263,25 @@ class RISE(BlackBoxXAIMethod):
         # Random shifts
         x = rand_generator.integers(0, cell_size[0])
         y = rand_generator.integers(0, cell_size[1])
-        # Linear up-sampling and cropping
-        upsampled_mask = cv2.resize(grid, up_size, interpolation=cv2.INTER_CUBIC)
-        mask = upsampled_mask[x : x + input_size[0], y : y + input_size[1]]
-        mask = np.clip(mask, 0, 1)
+        # Up-sampling and cropping, cropped rows/columns of the up-sampling matrices produce the cropped mask
+        mask = rows_interp[x : x + input_size[0]] @ grid @ cols_interp[:, y : y + input_size[1]]
+        # Cubic interpolation overshoots on both sides, clip in-place (mask is a fresh buffer)
+        np.maximum(mask, 0, out=mask)
+        np.minimum(mask, 1, out=mask)
         return mask
+
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _get_upsampling_matrices(input_size: Tuple[int, int], num_cells: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns rows and columns up-sampling matrices of the cubic grid up-sampling.
+        cv2.resize is separable and linear w.r.t. input values,
+        therefore cv2.resize(grid, up_size) == rows_interp @ grid @ cols_interp (up to float rounding),
+        which is much cheaper than up-sampling each mask with cv2.resize.
+        """
+        cell_size = np.ceil(np.array(input_size) / num_cells)
+        up_size = np.array((num_cells + 1) * cell_size, dtype=np.uint32)
+        identity = np.eye(num_cells, dtype=np.float32)
+        rows_interp = cv2.resize(identity, (num_cells, int(up_size[1])), interpolation=cv2.INTER_CUBIC)
+        cols_interp = cv2.resize(identity, (int(up_size[0]), num_cells), interpolation=cv2.INTER_CUBIC)
+        return rows_interp, cols_interp
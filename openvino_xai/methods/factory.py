@@ -104,7 +104,7 @@ class WhiteBoxMethodFactory(MethodFactory):
         if target_layer is None:
             logger.info("Target insertion layer is not provided - trying to find it in auto mode.")
         else:
-            logger.info(f"Target insertion layer {target_layer} is provided.")
+            logger.info("Target insertion layer %s is provided.", target_layer)
 
         if explain_method is None or explain_method == Method.RECIPROCAM:
             logger.info("Using ReciproCAM method (for CNNs).")
@@ -119,7 +119,7 @@ class WhiteBoxMethodFactory(MethodFactory):
                 )
             except Exception as e:
                 if explain_method is None:
-                    logger.info(f"Not successfull due to '{e}'. Trying another methods.")
+                    logger.info("Not successfull due to '%s'. Trying another methods.", e)
                     explain_method = Method.VITRECIPROCAM
                 else:
                     raise e
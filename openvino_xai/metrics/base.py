@@ -4,7 +4,7 @@ from typing import Any, Callable, Dict, List
 import numpy as np
 import openvino as ov
 
-from openvino_xai.common.utils import IdentityPreprocessFN
+from openvino_xai.common.utils import IdentityPreprocessFN, get_core
 from openvino_xai.explainer.explanation import Explanation
 
 
@@ -20,7 +20,7 @@ class BaseMetric(ABC):
     ):
         # Pass model_predict to class initialization directly?
         self.model = model
-        self.model_compiled = ov.Core().compile_model(model=model, device_name=device_name)
+        self.model_compiled = get_core().compile_model(model=model, device_name=device_name)
         self.preprocess_fn = preprocess_fn
         self.postprocess_fn = postprocess_fn
 
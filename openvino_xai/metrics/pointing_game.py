@@ -94,8 +94,8 @@ class PointingGame(BaseMetric):
 
                 if label_name not in image_gt_bboxes:
                     logger.info(
-                        f"No ground-truth bbox for {label_name} saliency map. "
-                        f"Skip pointing game evaluation for this saliency map."
+                        "No ground-truth bbox for %s saliency map. Skip pointing game evaluation for this saliency map.",
+                        label_name,
                     )
                     continue
 
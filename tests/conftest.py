@@ -2,15 +2,28 @@
 # SPDX-License-Identifier: Apache-2.0
 from __future__ import annotations
 
+import importlib.util
 import logging
 import os
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
+from typing import Callable, Iterator
 
+import cv2
+import numpy as np
+import openvino as ov
 import pytest
 
+from openvino_xai.common.utils import get_core, retrieve_otx_model
+
 log = logging.getLogger(__name__)
 
+# Rust-based parallel downloader for the timm weights. huggingface_hub reads the flag once on import and fails
+# downloads if the package is missing, so it is set here (before any test module imports timm) only if available.
+if importlib.util.find_spec("hf_transfer") is not None:
+    os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+
 
 def pytest_addoption(parser: pytest.Parser):
     """Add custom options for OpenVINO XAI tests."""
@@ -31,6 +44,27 @@ def pytest_addoption(parser: pytest.Parser):
         default=False,
         help="Whether to delete model cahce directory. Defaults to False.",
     )
+    parser.addoption(
+        "--slow",
+        action="store_true",
+        default=False,
+        help="Whether to run tests marked as slow (full model coverage). Defaults to False.",
+    )
+
+
+def pytest_configure(config: pytest.Config):
+    """Register custom markers."""
+    config.addinivalue_line("markers", "slow: extended coverage, which runs only with --slow option.")
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]):
+    """Skip tests marked as slow, unless --slow option is given."""
+    if config.getoption("--slow"):
+        return
+    skip_slow = pytest.mark.skip(reason="Slow test, use --slow option to run it.")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
 
 
 @pytest.fixture(scope="session")
@@ -68,3 +102,80 @@ def fxt_clear_cache(request: pytest.FixtureRequest) -> Path:
     log.info(msg)
     print(msg)
     return clear_cache
+
+
+@pytest.fixture(scope="session")
+def fxt_cheetah_image() -> np.ndarray:
+    """Test image, decoded once per session."""
+    return cv2.imread("tests/assets/cheetah_person.jpg")
+
+
+@pytest.fixture(scope="session")
+def fxt_blood_image() -> np.ndarray:
+    """Detection test image, decoded once per session."""
+    return cv2.imread("tests/assets/blood.jpg")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def fxt_ov_num_threads() -> Iterator[int | None]:
+    """
+    Splits CPU cores between pytest-xdist workers, so that models compiled by the concurrent workers
+    do not compete for all the cores (each of them would take all the cores by default).
+    Thread pinning is disabled, as each worker would otherwise pin its threads to the same first cores.
+    Properties of the shared core are restored at the end of the session.
+    """
+    num_workers = int(os.environ.get("PYTEST_XDIST_WORKER_COUNT", 1))
+    if num_workers <= 1:
+        yield None
+        return
+    num_threads = max((os.cpu_count() or 1) // num_workers, 1)
+    properties = {"INFERENCE_NUM_THREADS": num_threads, "ENABLE_CPU_PINNING": False}
+    core = get_core()
+    prev_properties = {name: core.get_property("CPU", name) for name in properties}
+    core.set_property("CPU", properties)
+    yield num_threads
+    core.set_property("CPU", prev_properties)
+
+
+@pytest.fixture(scope="session")
+def fxt_ov_cache_dir(fxt_data_root: Path) -> Iterator[Path]:
+    """
+    Enables OpenVINO model cache of the shared core, so that the following sessions skip the model compilation.
+    The previous cache directory of the shared core is restored at the end of the session.
+    """
+    cache_dir = fxt_data_root / "ov_cache"
+    core = get_core()
+    prev_cache_dir = core.get_property("CACHE_DIR")
+    core.set_property({"CACHE_DIR": str(cache_dir)})
+    yield cache_dir
+    core.set_property({"CACHE_DIR": prev_cache_dir})
+
+
+@pytest.fixture(scope="session")
+def fxt_read_model(fxt_ov_cache_dir: Path) -> Callable[[str | Path], ov.Model]:
+    """
+    Model reader, which parses each IR once per session and returns its copy on every call.
+    Models compiled in the tests using it are cached on disk (see fxt_ov_cache_dir).
+    """
+
+    @lru_cache(maxsize=None)
+    def _read_model(model_path: str) -> ov.Model:
+        return get_core().read_model(model_path)
+
+    def read_model(model_path: str | Path) -> ov.Model:
+        # Copy keeps cached model intact, if a test modifies the returned one
+        return _read_model(str(model_path)).clone()
+
+    return read_model
+
+
+@pytest.fixture(scope="session")
+def fxt_retrieve_otx_model(fxt_data_root: Path) -> Callable[[str], Path]:
+    """OTX model retriever, which checks or downloads each model once per session and returns path to its IR."""
+
+    @lru_cache(maxsize=None)
+    def _retrieve_otx_model(model_name: str) -> Path:
+        retrieve_otx_model(fxt_data_root, model_name)
+        return fxt_data_root / "otx_models" / (model_name + ".xml")
+
+    return _retrieve_otx_model
@@ -2,8 +2,9 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import csv
-import os
+import re
 import shutil
+from functools import lru_cache
 from pathlib import Path
 
 import cv2
@@ -21,13 +22,16 @@ from openvino_xai.explainer.utils import (
 )
 from openvino_xai.explainer.visualizer import Visualizer
 from openvino_xai.utils.model_export import export_to_ir, export_to_onnx
+from tests.intg.utils import grouped_by_model
 
 timm = pytest.importorskip("timm")
 torch = pytest.importorskip("torch")
 pytest.importorskip("onnx")
+huggingface_hub_constants = pytest.importorskip("huggingface_hub.constants")
 
 
-TEST_MODELS = timm.list_models(pretrained=True)
+# Independent per model, to be run in parallel with `pytest -n auto --dist loadgroup`
+TEST_MODELS = grouped_by_model(timm.list_models(pretrained=True))
 
 SUPPORTED_BUT_FAILED_BY_BB_MODELS = {}
 
@@ -89,6 +93,26 @@ NOT_SUPPORTED_BY_WB_MODELS = {
 }
 
 
+def compile_key_matcher(model_keys) -> re.Pattern:
+    """Compiles model id substrings into a single pattern, the matched key is returned by match.group()."""
+    # Never matching pattern for the empty set, as empty alternation would match any model id
+    return re.compile("|".join(map(re.escape, model_keys)) or "(?!)")
+
+
+NOT_SUPPORTED_BY_BB_MATCHER = compile_key_matcher(NOT_SUPPORTED_BY_BB_MODELS)
+SUPPORTED_BUT_FAILED_BY_BB_MATCHER = compile_key_matcher(SUPPORTED_BUT_FAILED_BY_BB_MODELS)
+NOT_SUPPORTED_BY_WB_MATCHER = compile_key_matcher(NOT_SUPPORTED_BY_WB_MODELS)
+SUPPORTED_BUT_FAILED_BY_WB_MATCHER = compile_key_matcher(SUPPORTED_BUT_FAILED_BY_WB_MODELS)
+
+
+@lru_cache(maxsize=1)
+def create_timm_model(model_id: str):
+    """Creates pretrained timm model in eval mode, shared by the tests of the same model."""
+    timm_model = timm.create_model(model_id, in_chans=3, pretrained=True, checkpoint_path="")
+    timm_model.eval()
+    return timm_model
+
+
 class TestImageClassificationTimm:
     clear_cache_converted_models = False
     clear_cache_hf_models = False
@@ -106,15 +130,14 @@ class TestImageClassificationTimm:
         self.clear_cache_hf_models = fxt_clear_cache
         self.clear_cache_converted_models = fxt_clear_cache
 
-    @pytest.mark.parametrize("model_id", TEST_MODELS)
+    # Class-scoped, so that white-box and black-box tests of the model run one after another and share the model
+    @pytest.mark.parametrize("model_id", TEST_MODELS, scope="class")
     def test_classification_white_box(self, model_id, dump_maps=False):
-        for skipped_model in NOT_SUPPORTED_BY_WB_MODELS.keys():
-            if skipped_model in model_id:
-                pytest.skip(reason=NOT_SUPPORTED_BY_WB_MODELS[skipped_model])
+        if match := NOT_SUPPORTED_BY_WB_MATCHER.search(model_id):
+            pytest.skip(reason=NOT_SUPPORTED_BY_WB_MODELS[match.group()])
 
-        for failed_model in SUPPORTED_BUT_FAILED_BY_WB_MODELS.keys():
-            if failed_model in model_id:
-                pytest.xfail(reason=SUPPORTED_BUT_FAILED_BY_WB_MODELS[failed_model])
+        if match := SUPPORTED_BUT_FAILED_BY_WB_MATCHER.search(model_id):
+            pytest.xfail(reason=SUPPORTED_BUT_FAILED_BY_WB_MODELS[match.group()])
 
         explain_method = None
 
@@ -154,17 +177,15 @@ class TestImageClassificationTimm:
         assert explanation is not None
         assert explanation.shape[-1] > 1 and explanation.shape[-2] > 1
         print(f"{model_id}: Generated classification saliency maps with shape {explanation.shape}.")
-        self.clear_cache()
+        self.clear_cache(model_id, timm_model)
 
-    @pytest.mark.parametrize("model_id", TEST_MODELS)
+    @pytest.mark.parametrize("model_id", TEST_MODELS, scope="class")
     def test_classification_black_box(self, model_id, dump_maps=False):
-        for skipped_model in NOT_SUPPORTED_BY_BB_MODELS.keys():
-            if skipped_model in model_id:
-                pytest.skip(reason=NOT_SUPPORTED_BY_BB_MODELS[skipped_model])
+        if match := NOT_SUPPORTED_BY_BB_MATCHER.search(model_id):
+            pytest.skip(reason=NOT_SUPPORTED_BY_BB_MODELS[match.group()])
 
-        for failed_model in SUPPORTED_BUT_FAILED_BY_BB_MODELS.keys():
-            if failed_model in model_id:
-                pytest.xfail(reason=SUPPORTED_BUT_FAILED_BY_BB_MODELS[failed_model])
+        if match := SUPPORTED_BUT_FAILED_BY_BB_MATCHER.search(model_id):
+            pytest.xfail(reason=SUPPORTED_BUT_FAILED_BY_BB_MODELS[match.group()])
 
         timm_model, model_cfg = self.get_timm_model(model_id)
         input_size = list(timm_model.default_cfg["input_size"])
@@ -202,25 +223,24 @@ class TestImageClassificationTimm:
         assert explanation is not None
         assert explanation.shape[-1] > 1 and explanation.shape[-2] > 1
         print(f"{model_id}: Generated classification saliency maps with shape {explanation.shape}.")
-        self.clear_cache()
+        self.clear_cache(model_id, timm_model)
 
     def get_timm_model(self, model_id):
-        timm_model = timm.create_model(model_id, in_chans=3, pretrained=True, checkpoint_path="")
-        timm_model.eval()
+        timm_model = create_timm_model(model_id)
         model_cfg = timm_model.default_cfg
         num_classes = model_cfg["num_classes"]
         if num_classes not in self.supported_num_classes:
-            self.clear_cache()
+            self.clear_cache(model_id, timm_model)
             pytest.skip(f"Number of model classes {num_classes} unknown")
         return timm_model, model_cfg
 
-    def clear_cache(self):
+    def clear_cache(self, model_id, timm_model):
+        """Removes cached files of the model only, so that tests of other models running in parallel are not affected."""
         if self.clear_cache_converted_models:
-            ir_model_dir = self.output_dir / "timm_models" / "converted_models"
-            if ir_model_dir.is_dir():
-                shutil.rmtree(ir_model_dir)
-        if self.clear_cache_hf_models:
-            cache_dir = os.environ.get("XDG_CACHE_HOME", "~/.cache")
-            huggingface_hub_dir = Path(cache_dir) / "huggingface/hub/"
-            if huggingface_hub_dir.is_dir():
-                shutil.rmtree(huggingface_hub_dir)
+            ir_model_dir = self.output_dir / "timm_models" / "converted_models" / model_id
+            shutil.rmtree(ir_model_dir, ignore_errors=True)
+        hf_hub_id = timm_model.pretrained_cfg.get("hf_hub_id")
+        if self.clear_cache_hf_models and hf_hub_id:
+            # Respects HF_HUB_CACHE / HF_HOME, so that the cache may be kept at a persistent location
+            huggingface_hub_dir = Path(huggingface_hub_constants.HF_HUB_CACHE)
+            shutil.rmtree(huggingface_hub_dir / ("models--" + hf_hub_id.replace("/", "--")), ignore_errors=True)
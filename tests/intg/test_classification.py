@@ -1,20 +1,24 @@
 # Copyright (C) 2023-2024 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
-import subprocess  # nosec B404 (not a part of product)
 from pathlib import Path
 
-import cv2
 import numpy as np
-import openvino as ov
 import pytest
 
 import openvino_xai.api.api as xai
+from examples import run_classification
 from openvino_xai.common.parameters import Method, Task
-from openvino_xai.common.utils import has_xai, retrieve_otx_model
+from openvino_xai.common.utils import has_xai
 from openvino_xai.explainer.explainer import Explainer, ExplainMode
 from openvino_xai.explainer.utils import get_postprocess_fn, get_preprocess_fn
 from openvino_xai.methods.black_box.base import Preset
+from tests.intg.utils import (
+    CachedPreprocessFN,
+    grouped_by_model,
+    model_group,
+    saliency_abs_diff,
+)
 
 MODELS = [
     "mlc_mobilenetv3_large_voc",  # verified
@@ -52,30 +56,93 @@ MODELS_VOC = [
 DEFAULT_CLS_MODEL = "mlc_mobilenetv3_large_voc"
 
 
+# Representative models for slow black-box tests, the rest of MODELS is run with --slow option
+QUICK_MODELS = [
+    "mlc_mobilenetv3_large_voc",
+    "mlc_efficient_b0_voc",
+    "classification_model_with_xai_head",
+]
+
+
+# Reference values are checked with embed_scaling=True for every model, while the divergence
+# of unscaled maps from the reference is checked on the default model only
+RECIPROCAM_CASES = [pytest.param(model_name, True, marks=model_group(model_name)) for model_name in MODELS] + [
+    pytest.param(DEFAULT_CLS_MODEL, False, marks=model_group(DEFAULT_CLS_MODEL))
+]
+
+
+def assert_scaled(saliency_maps: dict) -> None:
+    """Checks that every saliency map fills [0, 255] range, with a single reduction over the stacked maps."""
+    maps = np.stack(list(saliency_maps.values()))
+    maps = maps.reshape(len(maps), -1)
+    min_values, max_values = maps.min(axis=1), maps.max(axis=1)
+    assert np.all(min_values == 0), f"{min_values}"
+    assert np.all(np.isin(max_values, [254, 255])), f"{max_values}"
+
+
+@pytest.fixture(autouse=True, scope="class")
+def setup(request: pytest.FixtureRequest, fxt_cheetah_image, fxt_read_model, fxt_retrieve_otx_model):
+    """Shares session resources with the test class, once per class instead of before every test."""
+    request.cls.image = fxt_cheetah_image
+    request.cls.read_model = staticmethod(fxt_read_model)
+    request.cls.retrieve_otx_model = staticmethod(fxt_retrieve_otx_model)
+
+
+@pytest.fixture(scope="class")
+def fxt_reciprocam_explainer(
+    model_name: str,
+    embed_scaling: bool,
+    fxt_retrieve_otx_model,
+    fxt_read_model,
+) -> Explainer:
+    """ReciproCAM explainer, built once per (model_name, embed_scaling) and shared by the tests of the class."""
+    model = fxt_read_model(fxt_retrieve_otx_model(model_name))
+    return Explainer(
+        model=model,
+        task=Task.CLASSIFICATION,
+        preprocess_fn=TestClsWB.preprocess_fn,  # type: ignore
+        explain_mode=ExplainMode.WHITEBOX,
+        explain_method=Method.RECIPROCAM,
+        embed_scaling=embed_scaling,
+    )
+
+
+@pytest.fixture(scope="class")
+def fxt_rise_explainer(model_name: str, fxt_retrieve_otx_model, fxt_read_model) -> Explainer:
+    """RISE explainer, built once per model and shared by all the visualization parameters of the test."""
+    model = fxt_read_model(fxt_retrieve_otx_model(model_name))
+    return Explainer(
+        model=model,
+        task=Task.CLASSIFICATION,
+        preprocess_fn=TestClsBB.preprocess_fn,  # type: ignore
+        postprocess_fn=get_postprocess_fn(),  # type: ignore
+        explain_mode=ExplainMode.BLACKBOX,
+        explain_method=Method.RISE,
+    )
+
+
 class TestClsWB:
-    image = cv2.imread("tests/assets/cheetah_person.jpg")
     _ref_sal_maps_reciprocam = {
-        "mlc_mobilenetv3_large_voc": np.array([236, 237, 244, 252, 242, 225, 231], dtype=np.uint8),
-        "mlc_efficient_b0_voc": np.array([53, 128, 70, 234, 227, 255, 59], dtype=np.uint8),
-        "mlc_efficient_v2s_voc": np.array([144, 105, 116, 195, 209, 176, 176], dtype=np.uint8),
-        "classification_model_with_xai_head": np.array([165, 161, 209, 211, 208, 206, 196], dtype=np.uint8),
+        "mlc_mobilenetv3_large_voc": np.array([236, 237, 244, 252, 242, 225, 231], dtype=np.int16),
+        "mlc_efficient_b0_voc": np.array([53, 128, 70, 234, 227, 255, 59], dtype=np.int16),
+        "mlc_efficient_v2s_voc": np.array([144, 105, 116, 195, 209, 176, 176], dtype=np.int16),
+        "classification_model_with_xai_head": np.array([165, 161, 209, 211, 208, 206, 196], dtype=np.int16),
     }
     _ref_sal_maps_vitreciprocam = {
-        "deit-tiny": np.array([200, 171, 183, 196, 198, 196, 205, 225, 207, 173, 174, 134, 97, 117], dtype=np.uint8)
+        "deit-tiny": np.array([200, 171, 183, 196, 198, 196, 205, 225, 207, 173, 174, 134, 97, 117], dtype=np.int16)
     }
     _ref_sal_maps_activationmap = {
-        "mlc_mobilenetv3_large_voc": np.array([6, 3, 10, 15, 5, 0, 13], dtype=np.uint8),
+        "mlc_mobilenetv3_large_voc": np.array([6, 3, 10, 15, 5, 0, 13], dtype=np.int16),
     }
-    preprocess_fn = get_preprocess_fn(
-        change_channel_order=True,
-        input_size=(224, 224),
-        hwc_to_chw=True,
+    preprocess_fn = CachedPreprocessFN(
+        get_preprocess_fn(
+            change_channel_order=True,
+            input_size=(224, 224),
+            hwc_to_chw=True,
+        )
     )
 
-    @pytest.fixture(autouse=True)
-    def setup(self, fxt_data_root):
-        self.data_dir = fxt_data_root
-
+    @model_group("deit-tiny")
     @pytest.mark.parametrize("embed_scaling", [True, False])
     @pytest.mark.parametrize(
         "explain_all_classes",
@@ -86,10 +153,9 @@ class TestClsWB:
     )
     def test_vitreciprocam(self, embed_scaling: bool, explain_all_classes: bool):
         model_name = "deit-tiny"
-        retrieve_otx_model(self.data_dir, model_name)
-        model_path = self.data_dir / "otx_models" / (model_name + ".xml")
+        model_path = self.retrieve_otx_model(model_name)
 
-        model = ov.Core().read_model(model_path)
+        model = self.read_model(model_path)
 
         explainer = Explainer(
             model=model,
@@ -110,13 +176,13 @@ class TestClsWB:
             assert explanation is not None
             assert len(explanation.saliency_map) == MODEL_NUM_CLASSES[model_name]
             if model_name in self._ref_sal_maps_vitreciprocam:
-                actual_sal_vals = explanation.saliency_map[0][0, :].astype(np.int16)
-                ref_sal_vals = self._ref_sal_maps_vitreciprocam[model_name].astype(np.uint8)
+                actual_sal_vals = explanation.saliency_map[0][0, :]
+                ref_sal_vals = self._ref_sal_maps_vitreciprocam[model_name]
                 if embed_scaling:
                     # Reference values generated with embed_scaling=True
-                    assert np.all(np.abs(actual_sal_vals - ref_sal_vals) <= 1)
+                    assert saliency_abs_diff(actual_sal_vals, ref_sal_vals).max() <= 1
                 else:
-                    assert np.sum(np.abs(actual_sal_vals - ref_sal_vals)) > 100
+                    assert saliency_abs_diff(actual_sal_vals, ref_sal_vals).sum() > 100
 
         if not explain_all_classes:
             target_class = 1
@@ -131,70 +197,46 @@ class TestClsWB:
             assert len(explanation.saliency_map) == len([target_class])
             assert explanation.saliency_map[target_class].ndim == 2
 
-    @pytest.mark.parametrize("model_name", MODELS)
-    @pytest.mark.parametrize("embed_scaling", [True, False])
-    @pytest.mark.parametrize(
-        "explain_all_classes",
-        [
-            False,
-            True,
-        ],
-    )
-    def test_reciprocam(self, model_name: str, embed_scaling: bool, explain_all_classes: bool):
-        retrieve_otx_model(self.data_dir, model_name)
-        model_path = self.data_dir / "otx_models" / (model_name + ".xml")
-        model = ov.Core().read_model(model_path)
-
-        explainer = Explainer(
-            model=model,
-            task=Task.CLASSIFICATION,
-            preprocess_fn=self.preprocess_fn,  # type: ignore
-            explain_mode=ExplainMode.WHITEBOX,
-            explain_method=Method.RECIPROCAM,
-            embed_scaling=embed_scaling,
+    @pytest.mark.parametrize("model_name,embed_scaling", RECIPROCAM_CASES, scope="class")
+    def test_reciprocam_all_classes(self, fxt_reciprocam_explainer: Explainer, model_name: str, embed_scaling: bool):
+        explanation = fxt_reciprocam_explainer(
+            self.image,
+            targets=-1,
+            resize=False,
+            colormap=False,
         )
+        assert explanation is not None
+        assert len(explanation.saliency_map) == MODEL_NUM_CLASSES[model_name]
+        if model_name in self._ref_sal_maps_reciprocam:
+            actual_sal_vals = explanation.saliency_map[0][0, :]
+            ref_sal_vals = self._ref_sal_maps_reciprocam[model_name]
+            if embed_scaling:
+                # Reference values generated with embed_scaling=True
+                assert saliency_abs_diff(actual_sal_vals, ref_sal_vals).max() <= 1
+            else:
+                assert saliency_abs_diff(actual_sal_vals, ref_sal_vals).sum() > 100
 
-        if explain_all_classes:
-            explanation = explainer(
-                self.image,
-                targets=-1,
-                resize=False,
-                colormap=False,
-            )
-            assert explanation is not None
-            assert len(explanation.saliency_map) == MODEL_NUM_CLASSES[model_name]
-            if model_name in self._ref_sal_maps_reciprocam:
-                actual_sal_vals = explanation.saliency_map[0][0, :].astype(np.int16)
-                ref_sal_vals = self._ref_sal_maps_reciprocam[model_name].astype(np.uint8)
-                if embed_scaling:
-                    # Reference values generated with embed_scaling=True
-                    assert np.all(np.abs(actual_sal_vals - ref_sal_vals) <= 1)
-                else:
-                    if model_name == "classification_model_with_xai_head":
-                        pytest.skip("model already has fixed xai head - this test cannot change it.")
-                    assert np.sum(np.abs(actual_sal_vals - ref_sal_vals)) > 100
-
-        if not explain_all_classes:
-            target_class = 1
-            explanation = explainer(
-                self.image,
-                targets=[target_class],
-                resize=False,
-                colormap=False,
-            )
-            assert explanation is not None
-            assert target_class in explanation.saliency_map
-            assert len(explanation.saliency_map) == len([target_class])
-            assert explanation.saliency_map[target_class].ndim == 2
+    @pytest.mark.parametrize("model_name,embed_scaling", RECIPROCAM_CASES, scope="class")
+    def test_reciprocam_single_target(self, fxt_reciprocam_explainer: Explainer):
+        target_class = 1
+        explanation = fxt_reciprocam_explainer(
+            self.image,
+            targets=[target_class],
+            resize=False,
+            colormap=False,
+        )
+        assert explanation is not None
+        assert target_class in explanation.saliency_map
+        assert len(explanation.saliency_map) == len([target_class])
+        assert explanation.saliency_map[target_class].ndim == 2
 
-    @pytest.mark.parametrize("model_name", MODELS)
+    @pytest.mark.parametrize("model_name", grouped_by_model(MODELS))
     @pytest.mark.parametrize("embed_scaling", [True, False])
     def test_activationmap(self, model_name: str, embed_scaling: bool):
         if model_name == "classification_model_with_xai_head":
             pytest.skip("model already has reciprocam xai head - this test cannot change it.")
-        retrieve_otx_model(self.data_dir, model_name)
-        model_path = self.data_dir / "otx_models" / (model_name + ".xml")
-        model = ov.Core().read_model(model_path)
+        model_path = self.retrieve_otx_model(model_name)
+        model = self.read_model(model_path)
 
         explainer = Explainer(
             model=model,
@@ -212,14 +254,15 @@ class TestClsWB:
             colormap=False,
         )
         if model_name in self._ref_sal_maps_activationmap and embed_scaling:
-            actual_sal_vals = explanation.saliency_map["per_image_map"][0, :].astype(np.int16)
-            ref_sal_vals = self._ref_sal_maps_activationmap[model_name].astype(np.uint8)
+            actual_sal_vals = explanation.saliency_map["per_image_map"][0, :]
+            ref_sal_vals = self._ref_sal_maps_activationmap[model_name]
             # Reference values generated with embed_scaling=True
-            assert np.all(np.abs(actual_sal_vals - ref_sal_vals) <= 1)
+            assert saliency_abs_diff(actual_sal_vals, ref_sal_vals).max() <= 1
         assert explanation is not None
         assert "per_image_map" in explanation.saliency_map
         assert explanation.saliency_map["per_image_map"].ndim == 2
 
+    @model_group(DEFAULT_CLS_MODEL)
     @pytest.mark.parametrize(
         "explain_all_classes",
         [
@@ -229,9 +272,8 @@ class TestClsWB:
     )
     @pytest.mark.parametrize("overlay", [True, False])
     def test_classification_visualizing(self, explain_all_classes: bool, overlay: bool):
-        retrieve_otx_model(self.data_dir, DEFAULT_CLS_MODEL)
-        model_path = self.data_dir / "otx_models" / (DEFAULT_CLS_MODEL + ".xml")
-        model = ov.Core().read_model(model_path)
+        model_path = self.retrieve_otx_model(DEFAULT_CLS_MODEL)
+        model = self.read_model(model_path)
 
         explainer = Explainer(
             model=model,
@@ -261,14 +303,12 @@ class TestClsWB:
             assert explanation.shape == (354, 500, 3)
         else:
             assert explanation.shape == (7, 7)
-            for map_ in explanation.saliency_map.values():
-                assert map_.min() == 0, f"{map_.min()}"
-                assert map_.max() in {254, 255}, f"{map_.max()}"
+            assert_scaled(explanation.saliency_map)
 
+    @model_group(DEFAULT_CLS_MODEL)
     def test_two_sequential_norms(self):
-        retrieve_otx_model(self.data_dir, DEFAULT_CLS_MODEL)
-        model_path = self.data_dir / "otx_models" / (DEFAULT_CLS_MODEL + ".xml")
-        model = ov.Core().read_model(model_path)
+        model_path = self.retrieve_otx_model(DEFAULT_CLS_MODEL)
+        model = self.read_model(model_path)
 
         explainer = Explainer(
             model=model,
@@ -285,32 +325,27 @@ class TestClsWB:
             colormap=False,
         )
 
-        actual_sal_vals = explanation.saliency_map[0][0, :].astype(np.int16)
-        ref_sal_vals = self._ref_sal_maps_reciprocam[DEFAULT_CLS_MODEL].astype(np.uint8)
+        actual_sal_vals = explanation.saliency_map[0][0, :]
+        ref_sal_vals = self._ref_sal_maps_reciprocam[DEFAULT_CLS_MODEL]
         # Reference values generated with embed_scaling=True
-        assert np.all(np.abs(actual_sal_vals - ref_sal_vals) <= 1)
+        assert saliency_abs_diff(actual_sal_vals, ref_sal_vals).max() <= 1
 
-        for map_ in explanation.saliency_map.values():
-            assert map_.min() == 0, f"{map_.min()}"
-            assert map_.max() in {254, 255}, f"{map_.max()}"
+        assert_scaled(explanation.saliency_map)
 
 
 class TestClsBB:
-    image = cv2.imread("tests/assets/cheetah_person.jpg")
     _ref_sal_maps = {
-        "mlc_mobilenetv3_large_voc": np.array([246, 241, 236, 231, 226, 221, 216, 211, 205, 197], dtype=np.uint8),
+        "mlc_mobilenetv3_large_voc": np.array([246, 241, 236, 231, 226, 221, 216, 211, 205, 197], dtype=np.int16),
     }
-    preprocess_fn = get_preprocess_fn(
-        change_channel_order=True,
-        input_size=(224, 224),
-        hwc_to_chw=True,
+    preprocess_fn = CachedPreprocessFN(
+        get_preprocess_fn(
+            change_channel_order=True,
+            input_size=(224, 224),
+            hwc_to_chw=True,
+        )
     )
 
-    @pytest.fixture(autouse=True)
-    def setup(self, fxt_data_root):
-        self.data_dir = fxt_data_root
-
-    @pytest.mark.parametrize("model_name", MODELS)
+    @pytest.mark.parametrize("model_name", grouped_by_model(MODELS, QUICK_MODELS))
     @pytest.mark.parametrize("overlay", [True, False])
     @pytest.mark.parametrize("scaling", [True, False])
     def test_aise(
@@ -319,9 +354,8 @@ class TestClsBB:
         overlay: bool,
         scaling: bool,
     ):
-        retrieve_otx_model(self.data_dir, model_name)
-        model_path = self.data_dir / "otx_models" / (model_name + ".xml")
-        model = ov.Core().read_model(model_path)
+        model_path = self.retrieve_otx_model(model_name)
+        model = self.read_model(model_path)
 
         explainer = Explainer(
             model=model,
@@ -348,7 +382,6 @@ class TestClsBB:
         else:
             assert explanation.saliency_map[target_class].ndim == 2
 
-    @pytest.mark.parametrize("model_name", MODELS)
     @pytest.mark.parametrize("overlay", [True, False])
     @pytest.mark.parametrize(
         "explain_all_classes",
@@ -358,25 +391,17 @@ class TestClsBB:
         ],
     )
     @pytest.mark.parametrize("scaling", [True, False])
+    # Class-scoped parameter is applied first, so that tests are grouped by model and share the explainer
+    @pytest.mark.parametrize("model_name", grouped_by_model(MODELS, QUICK_MODELS), scope="class")
     def test_rise(
         self,
+        fxt_rise_explainer: Explainer,
         model_name: str,
         overlay: bool,
         explain_all_classes: bool,
         scaling: bool,
     ):
-        retrieve_otx_model(self.data_dir, model_name)
-        model_path = self.data_dir / "otx_models" / (model_name + ".xml")
-        model = ov.Core().read_model(model_path)
-
-        explainer = Explainer(
-            model=model,
-            task=Task.CLASSIFICATION,
-            preprocess_fn=self.preprocess_fn,  # type: ignore
-            postprocess_fn=get_postprocess_fn(),  # type: ignore
-            explain_mode=ExplainMode.BLACKBOX,
-            explain_method=Method.RISE,
-        )
+        explainer = fxt_rise_explainer
 
         if not explain_all_classes:
             target_class = 1
@@ -417,14 +442,12 @@ class TestClsBB:
                 assert len(explanation.saliency_map) == MODEL_NUM_CLASSES[model_name]
                 assert explanation.shape == (224, 224)
                 if scaling:
-                    for map_ in explanation.saliency_map.values():
-                        assert map_.min() == 0, f"{map_.min()}"
-                        assert map_.max() in {254, 255}, f"{map_.max()}"
+                    assert_scaled(explanation.saliency_map)
 
+    @model_group(DEFAULT_CLS_MODEL)
     def test_rise_xai_model_as_input(self):
-        retrieve_otx_model(self.data_dir, DEFAULT_CLS_MODEL)
-        model_path = self.data_dir / "otx_models" / (DEFAULT_CLS_MODEL + ".xml")
-        model = ov.Core().read_model(model_path)
+        model_path = self.retrieve_otx_model(DEFAULT_CLS_MODEL)
+        model = self.read_model(model_path)
         model_xai = xai.insert_xai(
             model,
             task=Task.CLASSIFICATION,
@@ -447,25 +470,16 @@ class TestClsBB:
             num_masks=5,
         )
 
-        actual_sal_vals = explanation.saliency_map[0][0, :10].astype(np.int16)
-        ref_sal_vals = self._ref_sal_maps[DEFAULT_CLS_MODEL].astype(np.uint8)
-        assert np.all(np.abs(actual_sal_vals - ref_sal_vals) <= 1)
+        actual_sal_vals = explanation.saliency_map[0][0, :10]
+        ref_sal_vals = self._ref_sal_maps[DEFAULT_CLS_MODEL]
+        assert saliency_abs_diff(actual_sal_vals, ref_sal_vals).max() <= 1
 
 
 class TestExample:
     """Test sanity of examples/run_classification.py."""
 
-    @pytest.fixture(autouse=True)
-    def setup(self, fxt_data_root):
-        self.data_dir = fxt_data_root
-
+    @model_group(DEFAULT_CLS_MODEL)
     def test_default_model(self):
-        retrieve_otx_model(self.data_dir, DEFAULT_CLS_MODEL)
-        model_path = self.data_dir / "otx_models" / (DEFAULT_CLS_MODEL + ".xml")
-        cmd = [
-            "python",
-            "examples/run_classification.py",
-            model_path,
-            "tests/assets/cheetah_person.jpg",
-        ]
-        subprocess.run(cmd, check=True)  # noqa: S603, PLW1510
+        model_path = self.retrieve_otx_model(DEFAULT_CLS_MODEL)
+        # Run in-process, which avoids interpreter startup and OpenVINO import of the subprocess
+        run_classification.main([str(model_path), "tests/assets/cheetah_person.jpg"])
@@ -2,16 +2,16 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import csv
-import os
 import shutil
+from functools import lru_cache
 from pathlib import Path
 
 import cv2
-import numpy as np
 import openvino as ov
 import pytest
 
 from openvino_xai.common.parameters import Method, Task
+from openvino_xai.common.utils import get_core
 from openvino_xai.explainer.explainer import Explainer, ExplainMode
 from openvino_xai.explainer.utils import (
     ActivationType,
@@ -25,6 +25,7 @@ from openvino_xai.utils.model_export import export_to_ir, export_to_onnx
 timm = pytest.importorskip("timm")
 torch = pytest.importorskip("torch")
 pytest.importorskip("onnx")
+huggingface_hub_constants = pytest.importorskip("huggingface_hub.constants")
 
 
 LIMITED_DIVERSE_SET_OF_CNN_MODELS = [
@@ -130,6 +131,14 @@ TEST_MODELS = (
 )
 
 
+@lru_cache(maxsize=2)
+def create_timm_model(model_id: str):
+    """Creates pretrained timm model in eval mode, shared by the tests of the same model."""
+    timm_model = timm.create_model(model_id, in_chans=3, pretrained=True, checkpoint_path="")
+    timm_model.eval()
+    return timm_model
+
+
 class TestImageClassificationTimm:
     fields = ["Model", "Exported to ONNX", "Exported to OV IR", "Explained", "Map size", "Map saved"]
     counter_row = ["Counters", "0", "0", "0", "-", "-"]
@@ -144,9 +153,11 @@ class TestImageClassificationTimm:
     }
 
     @pytest.fixture(autouse=True)
-    def setup(self, fxt_data_root, fxt_output_root, fxt_clear_cache):
+    def setup(self, fxt_data_root, fxt_output_root, fxt_clear_cache, worker_id):
         self.data_dir = fxt_data_root
         self.output_dir = fxt_output_root
+        # Each pytest-xdist worker writes its own report, so that concurrent workers do not overwrite each other
+        self.report_prefix = "timm_" if worker_id == "master" else f"timm_{worker_id}_"
         self.clear_cache_hf_models = fxt_clear_cache
         self.clear_cache_converted_models = fxt_clear_cache
 
@@ -162,7 +173,7 @@ class TestImageClassificationTimm:
         self.update_report("report_wb.csv", model_id)
 
         ir_path = model_dir / model_id / "model_fp32.xml"
-        model = ov.Core().read_model(ir_path)
+        model = get_core().read_model(ir_path)
 
         if model_id in LIMITED_DIVERSE_SET_OF_CNN_MODELS:
             explain_method = Method.RECIPROCAM
@@ -211,10 +222,15 @@ class TestImageClassificationTimm:
             # timm workaround to remove outlier activations at corners
             # TODO: find a root cause
             raw_sal_map = explanation.saliency_map[target_class]
-            raw_sal_map[0, 0] = np.mean(np.delete(raw_sal_map[:2, :2].flatten(), 0))
-            raw_sal_map[0, -1] = np.mean(np.delete(raw_sal_map[:2, -2:].flatten(), 1))
-            raw_sal_map[-1, 0] = np.mean(np.delete(raw_sal_map[-2:, :2].flatten(), 2))
-            raw_sal_map[-1, -1] = np.mean(np.delete(raw_sal_map[-2:, -2:].flatten(), 3))
+            # Each corner is replaced by the mean of its three neighbours in the 2x2 corner block (block views)
+            corner_blocks = {
+                (0, 0): raw_sal_map[:2, :2],
+                (0, -1): raw_sal_map[:2, -2:],
+                (-1, 0): raw_sal_map[-2:, :2],
+                (-1, -1): raw_sal_map[-2:, -2:],
+            }
+            for corner, block in corner_blocks.items():
+                raw_sal_map[corner] = (block.sum() - raw_sal_map[corner]) / 3
             explanation.saliency_map[target_class] = raw_sal_map
             visualizer = Visualizer()
             explanation = visualizer(
@@ -250,7 +266,7 @@ class TestImageClassificationTimm:
         self.update_report("report_bb.csv", model_id)
 
         ir_path = model_dir / model_id / "model_fp32.xml"
-        model = ov.Core().read_model(ir_path)
+        model = get_core().read_model(ir_path)
 
         mean_values = [(item * 255) for item in model_cfg["mean"]]
         scale_values = [(item * 255) for item in model_cfg["std"]]
@@ -456,18 +472,18 @@ class TestImageClassificationTimm:
                 pytest.skip(f"Model {model_id} is already explained.")
 
     def get_timm_model(self, model_id: str, model_dir: Path):
-        timm_model = timm.create_model(model_id, in_chans=3, pretrained=True, checkpoint_path="")
-        timm_model.eval()
+        timm_model = create_timm_model(model_id)
         model_cfg = timm_model.default_cfg
         num_classes = model_cfg["num_classes"]
         if num_classes not in self.supported_num_classes:
             self.clear_cache()
             pytest.skip(f"Number of model classes {num_classes} unknown")
         model_dir = model_dir / model_id
-        ir_path = model_dir / "model_fp32.xml"
-        if not ir_path.is_file():
+        # Converted models are reused across runs. All the files are checked, as an interrupted run may leave
+        # a partially converted model behind (tests read .xml with .bin, and .onnx)
+        converted_files = [model_dir / f"model_fp32.{ext}" for ext in ["xml", "bin", "onnx"]]
+        if not all(path.is_file() for path in converted_files):
             model_dir.mkdir(parents=True, exist_ok=True)
-            ir_path = model_dir / "model_fp32.xml"
             input_size = [1] + list(timm_model.default_cfg["input_size"])
             dummy_tensor = torch.rand(input_size)
             onnx_path = model_dir / "model_fp32.onnx"
@@ -486,7 +502,8 @@ class TestImageClassificationTimm:
         else:
             color = (0, 0, 255)
         thickness = 2
-        map_ = cv2.putText(
+        # Overlay maps are contiguous uint8 images, so the text is drawn in-place
+        cv2.putText(
             explanation.saliency_map[target_class],
             f"{target_confidence:.2f}",
             org,
@@ -496,7 +513,6 @@ class TestImageClassificationTimm:
             thickness,
             cv2.LINE_AA,
         )
-        explanation.saliency_map[target_class] = map_
 
     def update_report(
         self,
@@ -511,18 +527,16 @@ class TestImageClassificationTimm:
         fields = [model_id, exported_to_onnx, exported_to_ov_ir, explained, saliency_map_size, map_saved]
         last_row = self.report[-1]
         if last_row[0] != model_id:
+            prev_fields = [model_id, "False", "False", "False"]
             self.report.append(fields)
         else:
-            for i in range(len(last_row)):
-                if last_row[i] != fields[i]:
-                    last_row[i] = fields[i]
-            bool_flags = np.array(
-                [[self.count(model[1]), self.count(model[2]), self.count(model[3])] for model in self.report[2:]]
-            )
-            self.report[1][1] = str(bool_flags[:, 0].sum())
-            self.report[1][2] = str(bool_flags[:, 1].sum())
-            self.report[1][3] = str(bool_flags[:, 2].sum())
-        with open(self.output_dir / f"timm_{report_name}", "w") as f:
+            prev_fields = last_row.copy()
+            last_row[:] = fields
+        # Counters are updated by the changes of the model flags, instead of recounting all the rows
+        counter_row = self.report[1]
+        for i in range(1, 4):
+            counter_row[i] = str(int(counter_row[i]) + self.count(fields[i]) - self.count(prev_fields[i]))
+        with open(self.output_dir / f"{self.report_prefix}{report_name}", "w") as f:
             write = csv.writer(f)
             write.writerows(self.report)
 
@@ -532,8 +546,8 @@ class TestImageClassificationTimm:
             if ir_model_dir.is_dir():
                 shutil.rmtree(ir_model_dir)
         if self.clear_cache_hf_models:
-            cache_dir = os.environ.get("XDG_CACHE_HOME", "~/.cache")
-            huggingface_hub_dir = Path(cache_dir).expanduser() / "huggingface/hub/"
+            # Respects HF_HUB_CACHE / HF_HOME, so that the cache may be kept at a persistent location
+            huggingface_hub_dir = Path(huggingface_hub_constants.HF_HUB_CACHE)
             if huggingface_hub_dir.is_dir():
                 shutil.rmtree(huggingface_hub_dir)
 
@@ -1,17 +1,16 @@
 # Copyright (C) 2023-2024 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
-import subprocess  # nosec B404 (not a part of product)
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Dict, Tuple
 
-import addict
-import cv2
 import numpy as np
 import openvino as ov
 import pytest
 
+from examples import run_detection
 from openvino_xai.common.parameters import Method, Task
-from openvino_xai.common.utils import retrieve_otx_model
 from openvino_xai.explainer.explainer import Explainer, ExplainMode
 from openvino_xai.explainer.utils import get_preprocess_fn
 from openvino_xai.methods.black_box.aise.detection import AISEDetection
@@ -19,41 +18,51 @@ from openvino_xai.methods.factory import BlackBoxMethodFactory, WhiteBoxMethodFa
 from openvino_xai.methods.white_box.det_class_probability_map import (
     DetClassProbabilityMap,
 )
-
-MODEL_CONFIGS = addict.Addict(
-    {
-        "det_mobilenetv2_atss_bccd": {
-            "anchors": None,  # [1, 1, 1, 1, 1],
-            "num_classes": 3,
-            "node_names": [
-                "/bbox_head/atss_cls_1/Conv/WithoutBiases",
-                "/bbox_head/atss_cls_2/Conv/WithoutBiases",
-                "/bbox_head/atss_cls_3/Conv/WithoutBiases",
-                "/bbox_head/atss_cls_4/Conv/WithoutBiases",
-            ],
-            "input_size": (992, 736),
-        },
-        "det_mobilenetv2_ssd_bccd": {
-            "anchors": [4, 5],
-            "num_classes": 4,
-            "node_names": [
-                "/bbox_head/cls_convs.0/cls_convs.0.3/Conv/WithoutBiases",
-                "/bbox_head/cls_convs.1/cls_convs.1.3/Conv/WithoutBiases",
-            ],
-            "input_size": (864, 864),
-        },
-        "det_yolox_bccd": {
-            "anchors": None,  # [1, 1, 1, 1, 1],
-            "num_classes": 3,
-            "node_names": [
-                "/bbox_head/multi_level_conv_cls.0/Conv/WithoutBiases",
-                "/bbox_head/multi_level_conv_cls.1/Conv/WithoutBiases",
-                "/bbox_head/multi_level_conv_cls.2/Conv/WithoutBiases",
-            ],
-            "input_size": (416, 416),
-        },
-    }
-)
+from tests.intg.utils import get_cached_preprocess_fn, saliency_abs_diff
+
+
+@dataclass(frozen=True, slots=True)
+class ModelConfig:
+    """Detection model parameters for the XAI branch insertion."""
+
+    anchors: Tuple[int, ...] | None
+    num_classes: int
+    node_names: Tuple[str, ...]
+    input_size: Tuple[int, int]
+
+
+MODEL_CONFIGS: Dict[str, ModelConfig] = {
+    "det_mobilenetv2_atss_bccd": ModelConfig(
+        anchors=None,  # (1, 1, 1, 1, 1),
+        num_classes=3,
+        node_names=(
+            "/bbox_head/atss_cls_1/Conv/WithoutBiases",
+            "/bbox_head/atss_cls_2/Conv/WithoutBiases",
+            "/bbox_head/atss_cls_3/Conv/WithoutBiases",
+            "/bbox_head/atss_cls_4/Conv/WithoutBiases",
+        ),
+        input_size=(992, 736),
+    ),
+    "det_mobilenetv2_ssd_bccd": ModelConfig(
+        anchors=(4, 5),
+        num_classes=4,
+        node_names=(
+            "/bbox_head/cls_convs.0/cls_convs.0.3/Conv/WithoutBiases",
+            "/bbox_head/cls_convs.1/cls_convs.1.3/Conv/WithoutBiases",
+        ),
+        input_size=(864, 864),
+    ),
+    "det_yolox_bccd": ModelConfig(
+        anchors=None,  # (1, 1, 1, 1, 1),
+        num_classes=3,
+        node_names=(
+            "/bbox_head/multi_level_conv_cls.0/Conv/WithoutBiases",
+            "/bbox_head/multi_level_conv_cls.1/Conv/WithoutBiases",
+            "/bbox_head/multi_level_conv_cls.2/Conv/WithoutBiases",
+        ),
+        input_size=(416, 416),
+    ),
+}
 
 MODELS = list(MODEL_CONFIGS.keys())
 
@@ -66,47 +75,82 @@ EXPLAIN_ALL_CLASSES = [
 ]
 
 
+def reshape_to_input_size(model: ov.Model, model_name: str) -> ov.Model:
+    """Sets static input shape for the model with dynamic input, so that static-shape kernels are compiled."""
+    if model.inputs[0].get_partial_shape().is_dynamic:
+        width, height = MODEL_CONFIGS[model_name].input_size
+        model.reshape({model.inputs[0]: ov.PartialShape([1, 3, height, width])})
+    return model
+
+
+def create_dcpm_explainer(model: ov.Model, model_name: str, embed_scaling: bool = True) -> Explainer:
+    """Creates white-box DetClassProbabilityMap explainer for the detection model."""
+    return Explainer(
+        model=reshape_to_input_size(model, model_name),
+        task=Task.DETECTION,
+        preprocess_fn=get_cached_preprocess_fn(MODEL_CONFIGS[model_name].input_size),
+        explain_mode=ExplainMode.WHITEBOX,  # defaults to AUTO
+        explain_method=Method.DETCLASSPROBABILITYMAP,
+        target_layer=MODEL_CONFIGS[model_name].node_names,
+        embed_scaling=embed_scaling,
+        num_anchors=MODEL_CONFIGS[model_name].anchors,
+        saliency_map_size=TestDetWB._sal_map_size,
+    )
+
+
+@pytest.fixture(scope="class")
+def fxt_dcpm_explainer(model_name, embed_scaling, fxt_retrieve_otx_model, fxt_read_model) -> Explainer:
+    """DetClassProbabilityMap explainer, built once per (model_name, embed_scaling) and shared by the targets."""
+    model = fxt_read_model(fxt_retrieve_otx_model(model_name))
+    return create_dcpm_explainer(model, model_name, embed_scaling)
+
+
+@pytest.fixture(scope="class")
+def fxt_default_dcpm_explainer(fxt_retrieve_otx_model, fxt_read_model) -> Explainer:
+    """DetClassProbabilityMap explainer of the default model, shared by the tests of the class."""
+    model = fxt_read_model(fxt_retrieve_otx_model(DEFAULT_DET_MODEL))
+    return create_dcpm_explainer(model, DEFAULT_DET_MODEL)
+
+
+@pytest.fixture(scope="class")
+def fxt_aise_explainer(model_name, fxt_retrieve_otx_model, fxt_read_model) -> Explainer:
+    """Black-box AISE explainer, built once per model and shared by the tests of the class."""
+    model = fxt_read_model(fxt_retrieve_otx_model(model_name))
+    return Explainer(
+        model=reshape_to_input_size(model, model_name),
+        task=Task.DETECTION,
+        preprocess_fn=get_cached_preprocess_fn(MODEL_CONFIGS[model_name].input_size),
+        postprocess_fn=TestDetBB.postprocess_fn,
+        explain_mode=ExplainMode.BLACKBOX,  # defaults to AUTO
+        num_iterations_per_kernel=5,
+        divisors=[5],
+    )
+
+
 class TestDetWB:
     """
     Tests detection models in white-box mode.
     """
 
-    image = cv2.imread("tests/assets/blood.jpg")
     _ref_sal_maps = {
-        "det_mobilenetv2_atss_bccd": np.array([222, 243, 232, 229, 221, 217, 237, 246, 252, 255], dtype=np.uint8),
-        "det_mobilenetv2_ssd_bccd": np.array([83, 93, 61, 48, 110, 109, 78, 128, 158, 111], dtype=np.uint8),
-        "det_yolox_bccd": np.array([17, 13, 15, 60, 94, 52, 61, 47, 8, 40], dtype=np.uint8),
+        "det_mobilenetv2_atss_bccd": np.array([222, 243, 232, 229, 221, 217, 237, 246, 252, 255], dtype=np.int16),
+        "det_mobilenetv2_ssd_bccd": np.array([83, 93, 61, 48, 110, 109, 78, 128, 158, 111], dtype=np.int16),
+        "det_yolox_bccd": np.array([17, 13, 15, 60, 94, 52, 61, 47, 8, 40], dtype=np.int16),
     }
     _sal_map_size = (23, 23)
 
     @pytest.fixture(autouse=True)
-    def setup(self, fxt_data_root):
-        self.data_dir = fxt_data_root
+    def setup(self, fxt_blood_image, fxt_read_model, fxt_retrieve_otx_model):
+        self.retrieve_otx_model = fxt_retrieve_otx_model
+        self.read_model = fxt_read_model
+        self.image = fxt_blood_image
 
-    @pytest.mark.parametrize("model_name", MODELS)
-    @pytest.mark.parametrize("embed_scaling", [True, False])
     @pytest.mark.parametrize("explain_all_classes", EXPLAIN_ALL_CLASSES)
-    def test_detclassprobabilitymap(self, model_name, embed_scaling, explain_all_classes):
-        retrieve_otx_model(self.data_dir, model_name)
-        model_path = self.data_dir / "otx_models" / (model_name + ".xml")
-        model = ov.Core().read_model(model_path)
-
-        cls_head_output_node_names = MODEL_CONFIGS[model_name].node_names
-        preprocess_fn = get_preprocess_fn(
-            input_size=MODEL_CONFIGS[model_name].input_size,
-            hwc_to_chw=True,
-        )
-        explainer = Explainer(
-            model=model,
-            task=Task.DETECTION,
-            preprocess_fn=preprocess_fn,
-            explain_mode=ExplainMode.WHITEBOX,  # defaults to AUTO
-            explain_method=Method.DETCLASSPROBABILITYMAP,
-            target_layer=cls_head_output_node_names,
-            embed_scaling=embed_scaling,
-            num_anchors=MODEL_CONFIGS[model_name].anchors,
-            saliency_map_size=self._sal_map_size,
-        )
+    # Class-scoped parameters are applied first, so that tests are grouped by them and share the explainer
+    @pytest.mark.parametrize("model_name", MODELS, scope="class")
+    @pytest.mark.parametrize("embed_scaling", [True, False], scope="class")
+    def test_detclassprobabilitymap(self, fxt_dcpm_explainer, model_name, embed_scaling, explain_all_classes):
+        explainer = fxt_dcpm_explainer
 
         target_class_list = [1] if not explain_all_classes else -1
         explanation = explainer(
@@ -121,13 +165,13 @@ class TestDetWB:
             assert len(explanation.saliency_map) == MODEL_CONFIGS[model_name].num_classes
             assert explanation.saliency_map[0].shape == self._sal_map_size
 
-            actual_sal_vals = explanation.saliency_map[0][0, :10].astype(np.int16)
-            ref_sal_vals = self._ref_sal_maps[model_name].astype(np.uint8)
+            actual_sal_vals = explanation.saliency_map[0][0, :10]
+            ref_sal_vals = self._ref_sal_maps[model_name]
             if embed_scaling:
                 # Reference values generated with embed_scaling=True
-                assert np.all(np.abs(actual_sal_vals - ref_sal_vals) <= 1)
+                assert saliency_abs_diff(actual_sal_vals, ref_sal_vals).max() <= 1
             else:
-                assert np.sum(np.abs(actual_sal_vals - ref_sal_vals)) > 100
+                assert saliency_abs_diff(actual_sal_vals, ref_sal_vals).sum() > 100
 
         if not explain_all_classes:
             target_class = target_class_list[0]
@@ -137,27 +181,11 @@ class TestDetWB:
             assert explanation.saliency_map[target_class].shape == self._sal_map_size
 
     @pytest.mark.parametrize("explain_all_classes", EXPLAIN_ALL_CLASSES)
-    def test_detection_visualizing(self, explain_all_classes):
-        model = self.get_default_model()
+    def test_detection_visualizing(self, fxt_default_dcpm_explainer, explain_all_classes):
+        explainer = fxt_default_dcpm_explainer
 
         target_class_list = [1] if not explain_all_classes else -1
 
-        preprocess_fn = get_preprocess_fn(
-            input_size=MODEL_CONFIGS[DEFAULT_DET_MODEL].input_size,
-            hwc_to_chw=True,
-        )
-        cls_head_output_node_names = MODEL_CONFIGS[DEFAULT_DET_MODEL].node_names
-        explainer = Explainer(
-            model=model,
-            task=Task.DETECTION,
-            preprocess_fn=preprocess_fn,
-            explain_mode=ExplainMode.WHITEBOX,
-            explain_method=Method.DETCLASSPROBABILITYMAP,
-            target_layer=cls_head_output_node_names,
-            num_anchors=MODEL_CONFIGS[DEFAULT_DET_MODEL].anchors,
-            saliency_map_size=self._sal_map_size,
-        )
-
         explanation = explainer(
             self.image,
             targets=target_class_list,
@@ -172,24 +200,8 @@ class TestDetWB:
             assert len(explanation.saliency_map) == len(target_class_list)
             assert target_class in explanation.saliency_map
 
-    def test_two_sequential_norms(self):
-        model = self.get_default_model()
-
-        preprocess_fn = get_preprocess_fn(
-            input_size=MODEL_CONFIGS[DEFAULT_DET_MODEL].input_size,
-            hwc_to_chw=True,
-        )
-        cls_head_output_node_names = MODEL_CONFIGS[DEFAULT_DET_MODEL].node_names
-        explainer = Explainer(
-            model=model,
-            task=Task.DETECTION,
-            preprocess_fn=preprocess_fn,
-            explain_mode=ExplainMode.WHITEBOX,
-            explain_method=Method.DETCLASSPROBABILITYMAP,
-            target_layer=cls_head_output_node_names,
-            num_anchors=MODEL_CONFIGS[DEFAULT_DET_MODEL].anchors,
-            saliency_map_size=self._sal_map_size,
-        )
+    def test_two_sequential_norms(self, fxt_default_dcpm_explainer):
+        explainer = fxt_default_dcpm_explainer
 
         explanation = explainer(
             self.image,
@@ -199,10 +211,10 @@ class TestDetWB:
             colormap=False,
         )
 
-        actual_sal_vals = explanation.saliency_map[0][0, :10].astype(np.int16)
-        ref_sal_vals = self._ref_sal_maps[DEFAULT_DET_MODEL].astype(np.uint8)
+        actual_sal_vals = explanation.saliency_map[0][0, :10]
+        ref_sal_vals = self._ref_sal_maps[DEFAULT_DET_MODEL]
         # Reference values generated with embed_scaling=True
-        assert np.all(np.abs(actual_sal_vals - ref_sal_vals) <= 1)
+        assert saliency_abs_diff(actual_sal_vals, ref_sal_vals).max() <= 1
 
         for map_ in explanation.saliency_map.values():
             assert map_.min() == 0, f"{map_.min()}"
@@ -230,9 +242,8 @@ class TestDetWB:
         assert isinstance(det_xai_method.model_ori, ov.Model)
 
     def get_default_model(self):
-        retrieve_otx_model(self.data_dir, DEFAULT_DET_MODEL)
-        model_path = self.data_dir / "otx_models" / (DEFAULT_DET_MODEL + ".xml")
-        model = ov.Core().read_model(model_path)
+        model_path = self.retrieve_otx_model(DEFAULT_DET_MODEL)
+        model = self.read_model(model_path)
         return model
 
 
@@ -241,31 +252,15 @@ class TestDetBB:
     Tests detection models in black-box mode.
     """
 
-    image = cv2.imread("tests/assets/blood.jpg")
-
     @pytest.fixture(autouse=True)
-    def setup(self, fxt_data_root):
-        self.data_dir = fxt_data_root
+    def setup(self, fxt_blood_image, fxt_read_model, fxt_retrieve_otx_model):
+        self.retrieve_otx_model = fxt_retrieve_otx_model
+        self.read_model = fxt_read_model
+        self.image = fxt_blood_image
 
-    @pytest.mark.parametrize("model_name", MODELS)
-    def test_aisedetection(self, model_name):
-        retrieve_otx_model(self.data_dir, model_name)
-        model_path = self.data_dir / "otx_models" / (model_name + ".xml")
-        model = ov.Core().read_model(model_path)
-
-        preprocess_fn = get_preprocess_fn(
-            input_size=MODEL_CONFIGS[model_name].input_size,
-            hwc_to_chw=True,
-        )
-        explainer = Explainer(
-            model=model,
-            task=Task.DETECTION,
-            preprocess_fn=preprocess_fn,
-            postprocess_fn=self.postprocess_fn,
-            explain_mode=ExplainMode.BLACKBOX,  # defaults to AUTO
-            num_iterations_per_kernel=5,
-            divisors=[5],
-        )
+    @pytest.mark.parametrize("model_name", MODELS, scope="class")
+    def test_aisedetection(self, fxt_aise_explainer, model_name):
+        explainer = fxt_aise_explainer
 
         target_list = [1]
         explanation = explainer(
@@ -281,22 +276,10 @@ class TestDetBB:
         assert len(explanation.saliency_map) == len(target_list)
         assert explanation.saliency_map[target_class].ndim == 2
 
-    def test_detection_visualizing(self):
-        model = self.get_default_model()
-
-        preprocess_fn = get_preprocess_fn(
-            input_size=MODEL_CONFIGS[FAST_DET_MODEL].input_size,
-            hwc_to_chw=True,
-        )
-        explainer = Explainer(
-            model=model,
-            task=Task.DETECTION,
-            preprocess_fn=preprocess_fn,
-            postprocess_fn=self.postprocess_fn,
-            explain_mode=ExplainMode.BLACKBOX,  # defaults to AUTO
-            num_iterations_per_kernel=5,
-            divisors=[5],
-        )
+    # Shares the explainer with test_aisedetection of the same model
+    @pytest.mark.parametrize("model_name", [FAST_DET_MODEL], scope="class")
+    def test_detection_visualizing(self, fxt_aise_explainer):
+        explainer = fxt_aise_explainer
 
         target_list = [1]
         explanation = explainer(
@@ -327,9 +310,8 @@ class TestDetBB:
         assert isinstance(det_xai_method, AISEDetection)
 
     def get_default_model(self):
-        retrieve_otx_model(self.data_dir, FAST_DET_MODEL)
-        model_path = self.data_dir / "otx_models" / (FAST_DET_MODEL + ".xml")
-        model = ov.Core().read_model(model_path)
+        model_path = self.retrieve_otx_model(FAST_DET_MODEL)
+        model = self.read_model(model_path)
         return model
 
     @staticmethod
@@ -342,16 +324,10 @@ class TestExample:
     """Test sanity of examples/run_detection.py."""
 
     @pytest.fixture(autouse=True)
-    def setup(self, fxt_data_root):
-        self.data_dir = fxt_data_root
+    def setup(self, fxt_retrieve_otx_model):
+        self.retrieve_otx_model = fxt_retrieve_otx_model
 
     def test_default_model(self):
-        retrieve_otx_model(self.data_dir, DEFAULT_DET_MODEL)
-        model_path = self.data_dir / "otx_models" / (DEFAULT_DET_MODEL + ".xml")
-        cmd = [
-            "python",
-            "examples/run_detection.py",
-            model_path,
-            "tests/assets/blood.jpg",
-        ]
-        subprocess.run(cmd, check=True)  # noqa: S603, PLW1510
+        model_path = self.retrieve_otx_model(DEFAULT_DET_MODEL)
+        # Run in-process, which avoids interpreter startup and OpenVINO import of the subprocess
+        run_detection.main([str(model_path), "tests/assets/blood.jpg"])
@@ -0,0 +1,59 @@
+# Copyright (C) 2024 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+"""
+Helpers shared by the integration tests.
+"""
+from functools import lru_cache
+from typing import Callable, Tuple
+
+import numpy as np
+import pytest
+
+from openvino_xai.explainer.utils import get_preprocess_fn
+
+
+def model_group(model_name: str) -> pytest.MarkDecorator:
+    """Keeps tests of the model on the same worker with `pytest -n auto --dist loadgroup`, where model is cached."""
+    return pytest.mark.xdist_group(name=f"model-{model_name}")
+
+
+def grouped_by_model(model_names: list[str], quick_models: list[str] | None = None) -> list:
+    """Model names as parameters, grouped by model for pytest-xdist. Models out of quick_models are marked slow."""
+    params = []
+    for model_name in model_names:
+        marks = [model_group(model_name)]
+        if quick_models is not None and model_name not in quick_models:
+            marks.append(pytest.mark.slow)
+        params.append(pytest.param(model_name, marks=marks))
+    return params
+
+
+class CachedPreprocessFN:
+    """
+    Preprocess function, which reuses the result for the same input image object (the shared test image),
+    instead of resizing and transposing it for every test. The cached result is read-only.
+    """
+
+    def __init__(self, preprocess_fn: Callable[[np.ndarray], np.ndarray]):
+        self._preprocess_fn = preprocess_fn
+        self._input: np.ndarray | None = None
+        self._output: np.ndarray | None = None
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        if x is not self._input:
+            self._output = self._preprocess_fn(x)
+            self._output.setflags(write=False)
+            self._input = x
+        return self._output
+
+
+@lru_cache(maxsize=None)
+def get_cached_preprocess_fn(input_size: Tuple[int, int]) -> CachedPreprocessFN:
+    """Preprocess function for the input size, which preprocesses the shared test image once for all explainers."""
+    return CachedPreprocessFN(get_preprocess_fn(input_size=input_size, hwc_to_chw=True))
+
+
+def saliency_abs_diff(actual: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """Absolute difference of saliency values and int16 reference, computed in int16 without extra temporaries."""
+    diff = np.subtract(actual, reference, dtype=np.int16, casting="unsafe")
+    return np.abs(diff, out=diff)
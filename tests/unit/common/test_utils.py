@@ -3,11 +3,12 @@
 
 from pathlib import Path
 
+import numpy as np
 import openvino as ov
 
 from openvino_xai.api.api import insert_xai
 from openvino_xai.common.parameters import Task
-from openvino_xai.common.utils import has_xai, retrieve_otx_model
+from openvino_xai.common.utils import has_xai, retrieve_otx_model, sigmoid, softmax
 from tests.intg.test_classification import DEFAULT_CLS_MODEL
 
 
@@ -25,3 +26,34 @@ def test_has_xai(fxt_data_root: Path):
     )
 
     assert has_xai(model_xai)
+
+
+def test_softmax_sigmoid():
+    x = np.random.rand(3, 5).astype(np.float32)
+    x_copy = x.copy()
+
+    scores = softmax(x)
+    assert np.allclose(scores.sum(axis=-1), 1.0)
+    assert np.all(x == x_copy)
+
+    scores = sigmoid(x)
+    assert np.allclose(scores, 1 / (1 + np.exp(-x_copy)))
+    assert np.all(x == x_copy)
+
+    scores = softmax(x, copy=False)
+    assert scores is x
+    assert np.allclose(scores.sum(axis=-1), 1.0)
+
+
+def test_softmax_sigmoid_int_input():
+    # Integer logits of quantized models are computed in at least float32, not in float16
+    x = np.array([[-128, -3, 0, 5, 127]], dtype=np.int8)
+    x_float = x.astype(np.float32)
+
+    scores = sigmoid(x)
+    assert scores.dtype == np.float32
+    assert np.allclose(scores, sigmoid(x_float))
+
+    scores = softmax(x)
+    assert scores.dtype == np.float32
+    assert np.allclose(scores, softmax(x_float))
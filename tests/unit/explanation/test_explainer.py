@@ -302,25 +302,26 @@ class TestExplainer:
         assert explanation.saliency_map[0].shape == (100, 120, 3)
 
     def test_init_with_file(self, mocker: MockerFixture):
-        ov_core = mocker.patch("openvino.Core")
+        get_core = mocker.patch("openvino_xai.explainer.explainer.get_core")
+        ov_core = get_core.return_value
         create_method = mocker.patch("openvino_xai.Explainer.create_method")
         # None
         explainer = Explainer(
             model=None,
             task=Task.CLASSIFICATION,
         )
-        ov_core.assert_not_called()
+        get_core.assert_not_called()
         # str
         path = "model.xml"
         explainer = Explainer(
             model=path,
             task=Task.CLASSIFICATION,
         )
-        ov_core.return_value.read_model.assert_called_with(path)
+        ov_core.read_model.assert_called_with(path)
         # Path
         path = Path("model.xml")
         explainer = Explainer(
             model=path,
             task=Task.CLASSIFICATION,
         )
-        ov_core.return_value.read_model.assert_called_with(path)
+        ov_core.read_model.assert_called_with(path)
@@ -1,11 +1,19 @@
 # Copyright (C) 2023-2024 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
+import cv2
 import numpy as np
 import pytest
 
 from openvino_xai.common.utils import is_bhwc_layout
-from openvino_xai.explainer.utils import ActivationType, get_score, get_target_indices
+from openvino_xai.explainer.utils import (
+    ActivationType,
+    get_preprocess_fn,
+    get_score,
+    get_target_indices,
+    normalize_targets,
+    preprocess_fn,
+)
 
 VOC_NAMES = [
     "aeroplane",
@@ -56,6 +64,31 @@ def test_get_target_indices_str_spelling():
     assert str(exc_info.value) == "No all label names found in label_names. Check spelling."
 
 
+@pytest.mark.parametrize(
+    "targets,explain_all",
+    [
+        (-1, True),
+        ([-1], True),
+        (np.array([-1]), True),
+        ("-1", True),
+        (3, False),
+        ([1, 3], False),
+        ((1, 3), False),
+        (np.int16(1), False),
+        (np.array([1, 2]), False),
+        (["bicycle", "bottle"], False),
+    ],
+)
+def test_normalize_targets(targets, explain_all):
+    targets_np, explain_all_targets = normalize_targets(targets)
+    assert isinstance(targets_np, np.ndarray)
+    assert targets_np.ndim == 1
+    assert np.all(targets_np == np.atleast_1d(np.asarray(targets)))
+    assert explain_all_targets == explain_all
+    if targets_np.dtype.kind == "i":
+        assert targets_np.dtype == np.int64 or isinstance(targets, (np.ndarray, np.generic))
+
+
 def test_get_score():
     x = np.random.rand(5)
 
@@ -69,13 +102,29 @@ def test_get_score():
 
     score = get_score(x, 0, activation=ActivationType.SIGMOID)
     x_ = 1 / (1 + np.exp(-x))
-    assert score == x_[0]
+    assert score == pytest.approx(x_[0])
 
     x = np.random.rand(1, 5)
     score = get_score(x, 0)
     assert score == x[0][0]
 
 
+@pytest.mark.parametrize("input_size", [(16, 16), (3, 16)])
+def test_preprocess_fn(input_size):
+    # Test per-channel mean/std of shape (3,) passed directly, including input width equal to number of channels
+    x = np.random.randint(0, 256, (20, 20, 3), dtype=np.uint8)
+    mean = np.array([1.0, 2.0, 3.0])
+    std = np.array([2.0, 3.0, 4.0])
+    out = preprocess_fn(x, input_size=input_size, mean=mean, std=std, hwc_to_chw=True)
+    assert out.shape == (1, 3, input_size[1], input_size[0])
+
+    resized = cv2.resize(x, input_size).astype(np.float32)
+    expected = ((resized - mean) / std).transpose((2, 0, 1))[np.newaxis]
+    assert np.allclose(out, expected)
+    fn = get_preprocess_fn(input_size=input_size, mean=mean, std=std, hwc_to_chw=True)
+    assert np.array_equal(out, fn(x))
+
+
 def test_is_bhwc_layout():
     assert is_bhwc_layout(np.empty((1, 224, 224, 3)))
     assert is_bhwc_layout(np.empty((1, 3, 224, 224))) == False
@@ -1,54 +1,99 @@
 # Copyright (C) 2023-2024 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
+import cv2
 import numpy as np
 import pytest
 
 from openvino_xai.common.parameters import Task
 from openvino_xai.common.utils import get_min_max, scaling
 from openvino_xai.explainer.explanation import Explanation
-from openvino_xai.explainer.visualizer import Visualizer, colormap, overlay, resize
+from openvino_xai.explainer.visualizer import (
+    Visualizer,
+    colormap,
+    overlay,
+    resize,
+    resize_scale_colormap,
+)
+
+# Seeded, so that the random maps are the same for every run (and every xdist worker)
+RNG = np.random.default_rng(0)
 
 SALIENCY_MAPS = [
-    (np.random.rand(1, 5, 5) * 255).astype(np.uint8),
-    (np.random.rand(1, 2, 5, 5) * 255).astype(np.uint8),
+    (RNG.random((1, 5, 5)) * 255).astype(np.uint8),
+    (RNG.random((1, 2, 5, 5)) * 255).astype(np.uint8),
     {
-        0: (np.random.rand(5, 5) * 255).astype(np.uint8),
-        1: (np.random.rand(5, 5) * 255).astype(np.uint8),
+        0: (RNG.random((5, 5)) * 255).astype(np.uint8),
+        1: (RNG.random((5, 5)) * 255).astype(np.uint8),
     },
 ]
 
+SALIENCY_MAPS_IDS = ["3d", "4d", "dict"]
+
 EXPLAIN_ALL_CLASSES = [
     True,
     False,
 ]
 
-
-def test_scaling_3d():
-    # Test scaling on a multi-channel input
-    input_saliency_map = (np.random.rand(3, 5, 5) - 0.5) * 1000
+# Shared by all the visualizer cases, read-only to make sure that Visualizer does not modify the input image
+ORIGINAL_INPUT_IMAGE = np.ones((20, 20, 3))
+ORIGINAL_INPUT_IMAGE.setflags(write=False)
+
+
+def _visualizer_cases() -> list:
+    """
+    Visualizer flags (scaling, resize, colormap, overlay, overlay_weight) without dominated combinations.
+    overlay_weight is used only with overlay, and overlay always resizes, scales and colormaps the maps,
+    so overlay is checked with the default and with the inverted other flags.
+    """
+    cases = []
+    for scaling in [True, False]:
+        for resize in [True, False]:
+            for colormap in [True, False]:
+                flags = [
+                    name for name, flag in zip(["scaling", "resize", "colormap"], [scaling, resize, colormap]) if flag
+                ]
+                cases.append(pytest.param(scaling, resize, colormap, False, 0.5, id="+".join(flags) or "raw"))
+    cases.append(pytest.param(False, True, True, True, 0.5, id="overlay-0.5"))
+    cases.append(pytest.param(True, False, False, True, 0.3, id="overlay-0.3"))
+    return cases
+
+
+@pytest.mark.parametrize("shape", [(5, 5), (3, 5, 5)])
+def test_scaling(shape):
+    # Test scaling of 2D and multi-channel inputs, cast to uint8 and kept in float32
+    input_saliency_map = (RNG.random(shape) - 0.5) * 1000
     assert (input_saliency_map < 0).any() and (input_saliency_map > 255).any()
-    scaled_map = scaling(input_saliency_map)
-    assert (scaled_map >= 0).all() and (scaled_map <= 255).all()
-
 
-def test_scaling_2d():
-    # Test scaling on a simple 2D input
-    input_saliency_map = (np.random.rand(5, 5) - 0.5) * 1000
-    assert (input_saliency_map < 0).any() and (input_saliency_map > 255).any()
     scaled_map = scaling(input_saliency_map)
-    assert (scaled_map >= 0).all() and (scaled_map <= 255).all()
+    assert scaled_map.dtype == np.uint8
+    assert scaled_map.shape == shape
+    assert scaled_map.min() == 0 and scaled_map.max() in {254, 255}
+
+    scaled_map = scaling(input_saliency_map, cast_to_uint8=False)
+    assert scaled_map.dtype == np.float32
+    assert scaled_map.shape == shape
+    assert scaled_map.min() == 0 and scaled_map.max() == pytest.approx(255)
 
 
-def test_scaling_cast_to_int8():
-    # Test if output is correctly cast to uint8
-    input_saliency_map = (np.random.rand(3, 5, 5) - 0.5) * 1000
+def test_scaling_uint8():
+    # Test uint8 maps, which are already scaled or constant
+    input_saliency_map = RNG.integers(0, 256, (3, 5, 5), dtype=np.uint8)
+    input_saliency_map[:, 0, :2] = [0, 255]
+    input_saliency_map[1] = 7
     scaled_map = scaling(input_saliency_map)
     assert scaled_map.dtype == np.uint8
+    assert np.all(scaled_map[[0, 2]] == input_saliency_map[[0, 2]])
+    assert np.all(scaled_map[1] == 0)
 
-    input_saliency_map = (np.random.rand(3, 5, 5) - 0.5) * 1000
-    scaled_map = scaling(input_saliency_map, cast_to_uint8=False)
-    assert scaled_map.dtype == np.float32
+
+@pytest.mark.parametrize("max_value", [255, 100])
+def test_scaling_uint8_lut(max_value):
+    # Test that LUT scaling of large uint8 maps is bitwise equal to the generic float path
+    input_saliency_map = RNG.integers(10, 200, (3, 80, 80), dtype=np.uint8)
+    scaled_map = scaling(input_saliency_map, max_value=max_value)
+    assert scaled_map.dtype == np.uint8
+    assert np.array_equal(scaled_map, scaling(input_saliency_map.astype(np.float32), max_value=max_value))
 
 
 def test_get_min_max():
@@ -61,30 +106,42 @@ def test_get_min_max():
 
 def test_resize():
     # Test resizing functionality
-    input_saliency_map = np.random.randint(0, 255, (1, 3, 3), dtype=np.uint8)
+    input_saliency_map = RNG.integers(0, 255, (1, 3, 3), dtype=np.uint8)
     resized_map = resize(input_saliency_map, (5, 5))
     assert resized_map.shape == (1, 5, 5)
 
-    input_saliency_map = np.random.randint(0, 255, (2, 3, 3), dtype=np.uint8)
+    input_saliency_map = RNG.integers(0, 255, (2, 3, 3), dtype=np.uint8)
     resized_map = resize(input_saliency_map, (5, 5))
     assert resized_map.shape == (2, 5, 5)
 
     # Test resizing functionality with 700+ channels to check all classes scenario
-    input_saliency_map = np.random.randint(0, 255, (1001, 3, 3), dtype=np.uint8)
+    input_saliency_map = RNG.integers(0, 255, (1001, 3, 3), dtype=np.uint8)
     resized_map = resize(input_saliency_map, (5, 5))
     assert resized_map.shape == (1001, 5, 5)
 
     # Test resizing functionality for 2D saliency maps
-    input_saliency_map = np.random.randint(0, 255, (3, 3), dtype=np.uint8)
+    input_saliency_map = RNG.integers(0, 255, (3, 3), dtype=np.uint8)
     resized_map = resize(input_saliency_map, (5, 5))
     assert resized_map.shape == (5, 5)
 
 
 def test_colormap():
-    input_saliency_map = np.random.randint(0, 255, (1, 3, 3), dtype=np.uint8)
+    input_saliency_map = RNG.integers(0, 255, (1, 3, 3), dtype=np.uint8)
     colored_map = colormap(input_saliency_map)
     assert colored_map.shape == (1, 3, 3, 3)  # Check added color channels
 
+    expected_map = cv2.cvtColor(cv2.applyColorMap(input_saliency_map[0], cv2.COLORMAP_JET), cv2.COLOR_BGR2RGB)
+    assert np.array_equal(colored_map[0], expected_map)
+
+
+@pytest.mark.parametrize("num_workers", [1, 4])
+def test_resize_scale_colormap(num_workers, monkeypatch):
+    monkeypatch.setattr("openvino_xai.explainer.visualizer._NUM_WORKERS", num_workers)
+    input_saliency_map = RNG.integers(0, 255, (5, 3, 3), dtype=np.uint8)
+    colored_map = resize_scale_colormap(input_saliency_map, (5, 7), batch_size=2)
+    assert colored_map.shape == (5, 5, 7, 3)
+    assert np.array_equal(colored_map, colormap(scaling(resize(input_saliency_map, (5, 7)))))
+
 
 def test_overlay():
     # Test overlay functionality
@@ -94,15 +151,19 @@ def test_overlay():
     expected_output = np.ones((3, 3, 3), dtype=np.uint8) * 125
     assert (overlayed_image == expected_output).all()
 
+    # Test in-place overlay into the saliency map
+    overlayed_image = overlay(saliency_map, input_image, out=saliency_map)
+    assert overlayed_image is saliency_map
+    assert (overlayed_image == expected_output).all()
+
 
 class TestVisualizer:
-    @pytest.mark.parametrize("saliency_maps", SALIENCY_MAPS)
+    # Visualizer holds no state between calls, so a single instance is shared by all the cases
+    visualizer = Visualizer()
+
+    @pytest.mark.parametrize("saliency_maps", SALIENCY_MAPS, ids=SALIENCY_MAPS_IDS)
     @pytest.mark.parametrize("explain_all_classes", EXPLAIN_ALL_CLASSES)
-    @pytest.mark.parametrize("scaling", [True, False])
-    @pytest.mark.parametrize("resize", [True, False])
-    @pytest.mark.parametrize("colormap", [True, False])
-    @pytest.mark.parametrize("overlay", [True, False])
-    @pytest.mark.parametrize("overlay_weight", [0.5, 0.3])
+    @pytest.mark.parametrize("scaling,resize,colormap,overlay,overlay_weight", _visualizer_cases())
     def test_visualizer(
         self,
         saliency_maps,
@@ -121,9 +182,8 @@ class TestVisualizer:
         explanation = Explanation(saliency_maps, targets=explain_targets)
 
         raw_sal_map_dims = len(explanation.shape)
-        original_input_image = np.ones((20, 20, 3))
-        visualizer = Visualizer()
-        explanation = visualizer(
+        original_input_image = ORIGINAL_INPUT_IMAGE
+        explanation = self.visualizer(
             explanation=explanation,
             original_input_image=original_input_image,
             scaling=scaling,
@@ -149,8 +209,7 @@ class TestVisualizer:
 
         if isinstance(saliency_maps, np.ndarray) and saliency_maps.ndim == 3 and not overlay:
             explanation = Explanation(saliency_maps, targets=-1)
-            visualizer = Visualizer()
-            explanation_output_size = visualizer(
+            explanation_output_size = self.visualizer(
                 explanation=explanation,
                 output_size=(20, 20),
                 scaling=scaling,
@@ -171,8 +230,7 @@ class TestVisualizer:
                 }
             }
             explanation = Explanation(saliency_maps, targets=-1, metadata=metadata)
-            visualizer = Visualizer()
-            explanation_output_size = visualizer(
+            explanation_output_size = self.visualizer(
                 explanation=explanation,
                 original_input_image=original_input_image,
                 output_size=(20, 20),